@@ -9,6 +9,10 @@ def read_file(year: int, file: str) -> Iterator[str]:
         yield from f
 
 
+def read_bytes(year: int, file: str) -> bytes:
+    return (INPUT_FOLDER / str(year) / file).read_bytes()
+
+
 def read_file_with_filter(year: int, file: str) -> Iterator[str]:
     for line in read_file(year, file):
         if line:
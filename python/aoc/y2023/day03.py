@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import bisect
 import enum
 import itertools
 import math
@@ -8,6 +9,8 @@ from dataclasses import dataclass
 from functools import cached_property
 from typing import Iterator, Self
 
+import more_itertools
+
 from aoc import utils
 
 
@@ -160,6 +163,103 @@ class Engine:
             yield adjacent_regions
 
 
+@dataclass(kw_only=True)
+class RowNumber:
+    start: int
+    end: int
+    value: int
+
+    def adjacent(self, col: int) -> bool:
+        return self.start - 1 <= col <= self.end + 1
+
+
+@dataclass(kw_only=True)
+class SchemaRow:
+    numbers: list[RowNumber]
+    symbols: list[int]
+
+    @classmethod
+    def from_line(cls: type[Self], line: str) -> Self:
+        numbers: list[RowNumber] = []
+        symbols: list[int] = []
+        value = None
+        for col, c in enumerate(line):
+            if c.isdigit():
+                if value is None:
+                    value = 0
+                    start = col
+                value = value * 10 + int(c)
+                continue
+            if value is not None:
+                numbers.append(RowNumber(start=start, end=col - 1, value=value))
+                value = None
+            if c != ".":
+                symbols.append(col)
+        if value is not None:
+            numbers.append(RowNumber(start=start, end=len(line) - 1, value=value))
+        return cls(numbers=numbers, symbols=symbols)
+
+    def has_symbol_near(self, number: RowNumber) -> bool:
+        # symbols are sorted, so only the first one at or after `start - 1` matters
+        i = bisect.bisect_left(self.symbols, number.start - 1)
+        return i < len(self.symbols) and number.adjacent(self.symbols[i])
+
+    def numbers_near(self, col: int) -> Iterator[RowNumber]:
+        # numbers are sorted and never overlap, so their `end`s are sorted as well
+        i = bisect.bisect_left(self.numbers, col - 1, key=lambda number: number.end)
+        for number in itertools.islice(self.numbers, i, None):
+            if not number.adjacent(col):
+                break
+            yield number
+
+
+EMPTY_ROW = SchemaRow(numbers=[], symbols=[])
+
+
+class StreamingEngine:
+    """Solve the schematic with a rolling window of three rows.
+
+    Adjacency never reaches further than one row up or down, so only the
+    previous, current and next rows are kept in memory.
+    """
+
+    @staticmethod
+    def windows(
+        lines: Iterator[str],
+    ) -> Iterator[tuple[SchemaRow, ...]]:
+        # every window is `(above, row, below)`
+        rows = itertools.chain(
+            (EMPTY_ROW,),
+            map(SchemaRow.from_line, lines),
+            (EMPTY_ROW,),
+        )
+        # an empty schematic is padded to a single window of empty rows
+        yield from more_itertools.windowed(rows, 3, fillvalue=EMPTY_ROW)
+
+    @classmethod
+    def part_numbers(cls: type[Self], lines: Iterator[str]) -> Iterator[int]:
+        for above, row, below in cls.windows(lines):
+            for number in row.numbers:
+                if any(r.has_symbol_near(number) for r in (above, row, below)):
+                    yield number.value
+
+    @classmethod
+    def gear_ratios(
+        cls: type[Self],
+        lines: Iterator[str],
+        number_of_adjacent_numbers: int = 2,
+    ) -> Iterator[int]:
+        for above, row, below in cls.windows(lines):
+            for col in row.symbols:
+                numbers = [
+                    number.value
+                    for r in (above, row, below)
+                    for number in r.numbers_near(col)
+                ]
+                if len(numbers) == number_of_adjacent_numbers:
+                    yield math.prod(numbers)
+
+
 def solve_case_1() -> int:
     engine = Engine.from_lines(utils.read_file_with_filter_stripped(2023, "day03.txt"))
     engine.fill_state()
@@ -179,6 +279,53 @@ def solve_case_2() -> int:
     return total
 
 
+def solve_case_1_streaming() -> int:
+    return sum(
+        StreamingEngine.part_numbers(
+            utils.read_file_with_filter_stripped(2023, "day03.txt"),
+        ),
+    )
+
+
+def solve_case_2_streaming() -> int:
+    return sum(
+        StreamingEngine.gear_ratios(
+            utils.read_file_with_filter_stripped(2023, "day03.txt"),
+        ),
+    )
+
+
+def test_schema_row() -> None:
+    row = SchemaRow.from_line("467..*114.#12")
+    assert row.numbers == [
+        RowNumber(start=0, end=2, value=467),
+        RowNumber(start=6, end=8, value=114),
+        RowNumber(start=11, end=12, value=12),
+    ]
+    assert row.symbols == [5, 10]
+    assert [n.value for n in row.numbers_near(5)] == [114]
+    assert [n.value for n in row.numbers_near(10)] == [12]
+
+
+def test_streaming_engine() -> None:
+    lines = [
+        "467..114..",
+        "...*......",
+        "..35..633.",
+        "......#...",
+        "617*......",
+        ".....+.58.",
+        "..592.....",
+        "......755.",
+        "...$.*....",
+        ".664.598..",
+    ]
+    assert sum(StreamingEngine.part_numbers(iter(lines))) == 4361
+    assert sum(StreamingEngine.gear_ratios(iter(lines))) == 467835
+    assert sum(StreamingEngine.part_numbers(iter([]))) == 0
+    assert sum(StreamingEngine.gear_ratios(iter([]))) == 0
+
+
 def test_case_1() -> None:
     assert solve_case_1() == 549908
 
@@ -187,5 +334,13 @@ def test_case_2() -> None:
     assert solve_case_2() == 81166799
 
 
+def test_case_1_streaming() -> None:
+    assert solve_case_1_streaming() == 549908
+
+
+def test_case_2_streaming() -> None:
+    assert solve_case_2_streaming() == 81166799
+
+
 if __name__ == "__main__":
     unittest.main()
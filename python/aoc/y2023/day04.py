@@ -1,32 +1,94 @@
 from __future__ import annotations
 
-import math
+import itertools
 import unittest
+from typing import Iterable, Iterator
+
+import numpy as np
+import numpy.typing as npt
 
 from aoc import utils
 
+BLOCK_SIZE = 1 << 16
+
+
+def to_bitmask(numbers: Iterable[int]) -> int:
+    mask = 0
+    for number in numbers:
+        mask |= 1 << number
+    return mask
+
 
 def get_count(line: str) -> int:
     _, numbers = line.split(":")
     winning_numbers_str, own_numbers_str = numbers.split("|")
-    winning_numbers = {*map(int, winning_numbers_str.strip().split())}
-    matched_numbers = list(
-        filter(
-            lambda v: v in winning_numbers,
-            map(int, own_numbers_str.strip().split()),
-        ),
-    )
-    return len(matched_numbers)
+    winning_numbers = to_bitmask(map(int, winning_numbers_str.split()))
+    # own numbers are checked one by one, so a repeated own number counts each time
+    return sum(winning_numbers >> int(n) & 1 for n in own_numbers_str.split())
 
 
-def solve_case_1() -> int:
-    answer = 0
-    for line in utils.read_file_with_filter_stripped(2023, "day04.txt"):
-        matched_count = get_count(line)
-        if matched_count > 0:
-            answer += int(math.pow(2, matched_count - 1))
+def get_score(matched_count: int) -> int:
+    if matched_count == 0:
+        return 0
+    return 1 << (matched_count - 1)
+
+
+def get_total_instances(winning_counts: list[int]) -> int:
+    # copies won by card `i` are added to the range `i + 1 .. i + count` through a
+    # difference array, so each card is visited once
+    n = len(winning_counts)
+    diff = [0] * (n + 1)
+    running = 0
+    total = 0
+    for i, count in enumerate(winning_counts):
+        running += diff[i]
+        instances = running + 1
+        total += instances
+        diff[i + 1] += instances
+        diff[min(i + 1 + count, n)] -= instances
+    return total
+
 
-    return answer
+def parse_cards(
+    lines: Iterator[str],
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    # every card has the same layout, so all numbers can be read in one go and
+    # reshaped into `cards x (winning + own)`
+    first = next(lines)
+    winning_numbers_str, own_numbers_str = first.split(":")[-1].split("|")
+    winning_size = len(winning_numbers_str.split())
+    own_size = len(own_numbers_str.split())
+    # numbers are parsed by numpy straight from the text, without a python object
+    # per number
+    text = " ".join(
+        line[line.index(":") + 1 :] for line in itertools.chain((first,), lines)
+    ).replace("|", " ")
+    numbers = np.fromstring(text, dtype=np.int64, sep=" ")
+    cards = numbers.reshape(-1, winning_size + own_size)
+    return cards[:, :winning_size], cards[:, winning_size:]
+
+
+def get_counts_numpy(
+    winning_numbers: npt.NDArray[np.int64],
+    own_numbers: npt.NDArray[np.int64],
+) -> npt.NDArray[np.int64]:
+    counts = np.empty(len(winning_numbers), dtype=np.int64)
+    for start in range(0, len(winning_numbers), BLOCK_SIZE):
+        block = slice(start, start + BLOCK_SIZE)
+        matched = winning_numbers[block, :, None] == own_numbers[block, None, :]
+        counts[block] = matched.any(axis=1).sum(axis=1)
+    return counts
+
+
+def get_scores_numpy(counts: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+    return np.where(counts > 0, np.left_shift(1, np.maximum(counts - 1, 0)), 0)
+
+
+def solve_case_1() -> int:
+    return sum(
+        get_score(get_count(line))
+        for line in utils.read_file_with_filter_stripped(2023, "day04.txt")
+    )
 
 
 def solve_case_2() -> int:
@@ -34,11 +96,58 @@ def solve_case_2() -> int:
         get_count(line)
         for line in utils.read_file_with_filter_stripped(2023, "day04.txt")
     ]
-    cards_instances = [1] * len(winning_counts)
-    for i, count in enumerate(winning_counts):
-        for j in range(i + 1, min(i + 1 + count, len(cards_instances))):
-            cards_instances[j] += cards_instances[i]
-    return sum(cards_instances)
+    return get_total_instances(winning_counts)
+
+
+def solve_case_1_numpy() -> int:
+    winning_numbers, own_numbers = parse_cards(
+        utils.read_file_with_filter_stripped(2023, "day04.txt"),
+    )
+    counts = get_counts_numpy(winning_numbers, own_numbers)
+    return int(get_scores_numpy(counts).sum())
+
+
+def solve_case_2_numpy() -> int:
+    winning_numbers, own_numbers = parse_cards(
+        utils.read_file_with_filter_stripped(2023, "day04.txt"),
+    )
+    counts = get_counts_numpy(winning_numbers, own_numbers)
+    # the number of copies of a card depends on all cards before it, so this part
+    # stays a single sequential pass over the counts
+    return get_total_instances(counts.tolist())
+
+
+def test_get_count() -> None:
+    assert get_count("Card 1: 41 48 83 86 17 | 83 86  6 31 17  9 48 53") == 4
+    assert get_count("Card 6: 31 18 13 56 72 | 74 77 10 23 35 67 36 11") == 0
+    assert get_count("Card 1: 5 6 | 5 5 7") == 2
+    assert get_counts_numpy(np.array([[5, 6]]), np.array([[5, 5, 7]])).tolist() == [2]
+
+
+def test_get_score() -> None:
+    assert list(map(get_score, [0, 1, 2, 4])) == [0, 1, 2, 8]
+
+
+def test_get_total_instances() -> None:
+    assert get_total_instances([4, 2, 2, 1, 0, 0]) == 30
+    assert get_total_instances([5]) == 1
+
+
+def test_numpy() -> None:
+    lines = [
+        "Card 1: 41 48 83 86 17 | 83 86  6 31 17  9 48 53",
+        "Card 2: 13 32 20 16 61 | 61 30 68 82 17 32 24 19",
+        "Card 3:  1 21 53 59 44 | 69 82 63 72 16 21 14  1",
+        "Card 4: 41 92 73 84 69 | 59 84 76 51 58  5 54 83",
+        "Card 5: 87 83 26 28 32 | 88 30 70 12 93 22 82 36",
+        "Card 6: 31 18 13 56 72 | 74 77 10 23 35 67 36 11",
+    ]
+    winning_numbers, own_numbers = parse_cards(iter(lines))
+    assert winning_numbers.shape == (6, 5)
+    assert own_numbers.shape == (6, 8)
+    counts = get_counts_numpy(winning_numbers, own_numbers)
+    assert counts.tolist() == [4, 2, 2, 1, 0, 0]
+    assert get_scores_numpy(counts).tolist() == [8, 2, 2, 1, 0, 0]
 
 
 def test_case_1() -> None:
@@ -49,5 +158,13 @@ def test_case_2() -> None:
     assert solve_case_2() == 5037841
 
 
+def test_case_1_numpy() -> None:
+    assert solve_case_1_numpy() == 32001
+
+
+def test_case_2_numpy() -> None:
+    assert solve_case_2_numpy() == 5037841
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import bisect
 import itertools
 from dataclasses import dataclass
 from functools import cached_property
-from typing import Iterator, Self
+from typing import Iterable, Iterator, Self
 
 import more_itertools
+import numpy as np
+import numpy.typing as npt
 
 from aoc import utils
 
@@ -16,6 +19,25 @@ class Seeds:
     end: int
 
 
+@dataclass
+class SeedsSet:
+    # sorted, non-overlapping and non-adjacent ranges
+    data: list[Seeds]
+
+    @classmethod
+    def from_iter(cls: type[Self], seeds: Iterable[Seeds]) -> Self:
+        data: list[Seeds] = []
+        for s in sorted(seeds, key=lambda x: x.start):
+            if data and s.start <= data[-1].end + 1:
+                data[-1].end = max(data[-1].end, s.end)
+            else:
+                data.append(Seeds(start=s.start, end=s.end))
+        return cls(data)
+
+    def __iter__(self) -> Iterator[Seeds]:
+        return iter(self.data)
+
+
 @dataclass(kw_only=True)
 class MapItem:
     src: int
@@ -86,10 +108,21 @@ class Map:
     def __repr__(self) -> str:
         return f"(name={self.name}, {" ".join(str(d) for d in self.data)})"
 
+    @cached_property
+    def min_diff(self) -> int:
+        # seeds outside of `data` are kept as-is
+        return min(0, *(x.diff for x in self.data))
+
     def location(self, seeds: Seeds) -> Iterator[Seeds]:
-        # normal map items
-        next_seeds = (x.location(seeds) for x in self.data)
-        yield from (s for s in next_seeds if s is not None)
+        # normal map items, `data` is sorted by `src` so start from the first item
+        # ending at or after `seeds.start` and stop once past `seeds.end`
+        i = bisect.bisect_left(self.data, seeds.start, key=lambda x: x.end)
+        for map_item in itertools.islice(self.data, i, None):
+            if map_item.start > seeds.end:
+                break
+            next_seed = map_item.location(seeds)
+            if next_seed is not None:
+                yield next_seed
 
         # edge map items
         if seeds.start < self.data[0].start:
@@ -111,6 +144,106 @@ class Map:
                 yield next_seed
 
 
+@dataclass(kw_only=True)
+class MapArray:
+    starts: npt.NDArray[np.int64]
+    ends: npt.NDArray[np.int64]
+    diffs: npt.NDArray[np.int64]
+
+    @classmethod
+    def from_map(cls: type[Self], m: Map) -> Self:
+        # `Map.data` is already sorted by `src`
+        return cls(
+            starts=np.array([item.start for item in m.data], dtype=np.int64),
+            ends=np.array([item.end for item in m.data], dtype=np.int64),
+            diffs=np.array([item.diff for item in m.data], dtype=np.int64),
+        )
+
+    def location(self, seeds: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+        indices = np.searchsorted(self.starts, seeds, side="right") - 1
+        clipped = np.maximum(indices, 0)
+        mapped = (indices >= 0) & (seeds <= self.ends[clipped])
+        return seeds + np.where(mapped, self.diffs[clipped], 0)
+
+
+@dataclass(kw_only=True)
+class PiecewiseMap:
+    # segment `i` covers `starts[i] .. starts[i + 1] - 1` and shifts it by `diffs[i]`,
+    # the last segment is unbounded, anything before `starts[0]` is not mapped
+    starts: list[int]
+    diffs: list[int]
+
+    @classmethod
+    def identity(cls: type[Self]) -> Self:
+        return cls(starts=[0], diffs=[0])
+
+    @classmethod
+    def from_map(cls: type[Self], m: Map) -> Self:
+        starts: list[int] = []
+        diffs: list[int] = []
+        if m.data[0].start > 0:
+            starts.append(0)
+            diffs.append(0)
+        for item in m.data:
+            starts.append(item.start)
+            diffs.append(item.diff)
+        starts.append(m.data[-1].end + 1)
+        diffs.append(0)
+        return cls(starts=starts, diffs=diffs)
+
+    def find(self, seed: int) -> int:
+        return bisect.bisect_right(self.starts, seed) - 1
+
+    def compose(self, other: PiecewiseMap) -> PiecewiseMap:
+        # `other` is applied after `self`, so every segment of `self` is split at the
+        # breakpoints of `other` that fall inside its image
+        starts: list[int] = []
+        diffs: list[int] = []
+        for i, (start, diff) in enumerate(zip(self.starts, self.diffs, strict=True)):
+            j = other.find(start + diff)
+            starts.append(start)
+            diffs.append(diff + other.diffs[j])
+
+            end = self.starts[i + 1] - 1 if i + 1 < len(self.starts) else None
+            for other_start, other_diff in zip(
+                itertools.islice(other.starts, j + 1, None),
+                itertools.islice(other.diffs, j + 1, None),
+                strict=True,
+            ):
+                if end is not None and other_start > end + diff:
+                    break
+                starts.append(other_start - diff)
+                diffs.append(diff + other_diff)
+
+        return PiecewiseMap(starts=starts, diffs=diffs).merged()
+
+    def merged(self) -> PiecewiseMap:
+        starts: list[int] = []
+        diffs: list[int] = []
+        for start, diff in zip(self.starts, self.diffs, strict=True):
+            if diffs and diffs[-1] == diff:
+                continue
+            starts.append(start)
+            diffs.append(diff)
+        return PiecewiseMap(starts=starts, diffs=diffs)
+
+    def location(self, seed: int) -> int:
+        return seed + self.diffs[self.find(seed)]
+
+    def best_location(self, seeds: Seeds) -> int:
+        i = self.find(seeds.start)
+        best = seeds.start + self.diffs[i]
+        for start, diff in zip(
+            itertools.islice(self.starts, i + 1, None),
+            itertools.islice(self.diffs, i + 1, None),
+            strict=True,
+        ):
+            if start > seeds.end:
+                break
+            best = min(best, start + diff)
+        return best
+
+
 @dataclass
 class Almanac:
     seeds: list[int]
@@ -120,18 +253,78 @@ class Almanac:
     def from_iter(cls: type[Self], lines: Iterator[str]) -> Self:
         seeds = list(map(int, next(lines).split(":")[-1].strip().split()))
 
-        # empty line
-        next(lines)
-
-        maps = [Map.from_iter(lines) for _ in range(7)]
+        lines = more_itertools.peekable(lines)
+        maps: list[Map] = []
+        while lines:
+            # empty lines between maps
+            if not lines.peek().strip():
+                next(lines)
+                continue
+            maps.append(Map.from_iter(lines))
 
         return cls(seeds=seeds, maps=maps)
 
+    @cached_property
+    def composed_map(self) -> PiecewiseMap:
+        composed = PiecewiseMap.identity()
+        for m in self.maps:
+            composed = composed.compose(PiecewiseMap.from_map(m))
+        return composed
+
+    @cached_property
+    def map_arrays(self) -> list[MapArray]:
+        return [MapArray.from_map(m) for m in self.maps]
+
+    def locations(self, seeds: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+        for map_array in self.map_arrays:
+            seeds = map_array.location(seeds)
+        return seeds
+
+    @cached_property
+    def lower_bound_offsets(self) -> list[int]:
+        # `lower_bound_offsets[k]`: the most the maps from `k` onward can lower a seed
+        offsets = [0]
+        for m in reversed(self.maps):
+            offsets.append(offsets[-1] + m.min_diff)
+        return offsets[::-1]
+
+    def lowest_location(self, seeds_iter: Iterable[Seeds]) -> int:
+        # depth first search over (layer, seeds), children are explored in order of
+        # their lower bound and pruned once they cannot beat the best location
+        def lower_bound(layer: int, seeds: Seeds) -> int:
+            return seeds.start + self.lower_bound_offsets[layer]
+
+        def push(layer: int, children: Iterable[Seeds]) -> None:
+            stack.extend(
+                sorted(
+                    ((layer, seeds) for seeds in children),
+                    key=lambda x: lower_bound(*x),
+                    reverse=True,
+                ),
+            )
+
+        best: int | None = None
+        stack: list[tuple[int, Seeds]] = []
+        push(0, seeds_iter)
+        while stack:
+            layer, seeds = stack.pop()
+            if best is not None and lower_bound(layer, seeds) >= best:
+                continue
+            if layer == len(self.maps):
+                best = seeds.start
+                continue
+            push(layer + 1, self.maps[layer].location(seeds))
+
+        assert best is not None
+        return best
+
     def best_location(self, seeds: Seeds) -> int:
-        locs: list[Seeds] = [seeds]
+        locs = SeedsSet([seeds])
         for m in self.maps:
-            locs = list(more_itertools.flatten(m.location(loc) for loc in locs))
-        return min(loc.start for loc in locs)
+            locs = SeedsSet.from_iter(
+                more_itertools.flatten(m.location(loc) for loc in locs),
+            )
+        return locs.data[0].start
 
 
 def solve_case_1() -> int:
@@ -152,6 +345,41 @@ def solve_case_2() -> int:
     )
 
 
+def solve_case_1_composed() -> int:
+    almanac = Almanac.from_iter(utils.read_file(2023, "day05.txt"))
+    return min(almanac.composed_map.location(seed) for seed in almanac.seeds)
+
+
+def solve_case_1_numpy() -> int:
+    almanac = Almanac.from_iter(utils.read_file(2023, "day05.txt"))
+    seeds = np.array(almanac.seeds, dtype=np.int64)
+    return int(almanac.locations(seeds).min())
+
+
+def solve_case_2_branch_and_bound() -> int:
+    almanac = Almanac.from_iter(utils.read_file(2023, "day05.txt"))
+    return almanac.lowest_location(
+        Seeds(start=start, end=start + diff - 1)
+        for start, diff in zip(
+            itertools.islice(almanac.seeds, 0, None, 2),
+            itertools.islice(almanac.seeds, 1, None, 2),
+            strict=True,
+        )
+    )
+
+
+def solve_case_2_composed() -> int:
+    almanac = Almanac.from_iter(utils.read_file(2023, "day05.txt"))
+    return min(
+        almanac.composed_map.best_location(Seeds(start=start, end=start + diff - 1))
+        for start, diff in zip(
+            itertools.islice(almanac.seeds, 0, None, 2),
+            itertools.islice(almanac.seeds, 1, None, 2),
+            strict=True,
+        )
+    )
+
+
 def test_create_gap() -> None:
     map_item1 = MapItem(src=10, dst=20, length=7)
     map_item2 = MapItem(src=20, dst=30, length=5)
@@ -191,9 +419,122 @@ def test_map_location() -> None:
     ]
 
 
+def test_lowest_location() -> None:
+    lines = [
+        "seeds: 79 14 55 13",
+        "",
+        "seed-to-soil map:",
+        "50 98 2",
+        "52 50 48",
+        "",
+        "soil-to-fertilizer map:",
+        "0 15 37",
+        "37 52 2",
+        "39 0 15",
+    ]
+    almanac = Almanac.from_iter(iter(lines))
+    assert almanac.lower_bound_offsets == [-63, -15, 0]
+    for start in range(0, 110, 7):
+        for end in range(start, 110, 5):
+            assert almanac.lowest_location([Seeds(start=start, end=end)]) == (
+                almanac.best_location(Seeds(start=start, end=end))
+            )
+
+
+def test_seeds_set() -> None:
+    seeds_set = SeedsSet.from_iter(
+        [
+            Seeds(start=20, end=24),
+            Seeds(start=0, end=9),
+            Seeds(start=10, end=12),
+            Seeds(start=22, end=30),
+            Seeds(start=40, end=40),
+        ],
+    )
+    assert seeds_set == SeedsSet(
+        [
+            Seeds(start=0, end=12),
+            Seeds(start=20, end=30),
+            Seeds(start=40, end=40),
+        ],
+    )
+
+
+def test_piecewise_map() -> None:
+    test_data = [
+        "test",
+        "30 20 8",
+        "20 10 5",
+    ]
+    piecewise_map = PiecewiseMap.from_map(Map.from_iter(iter(test_data)))
+    assert piecewise_map == PiecewiseMap(
+        starts=[0, 10, 15, 20, 28],
+        diffs=[0, 10, 0, 10, 0],
+    )
+    assert piecewise_map.location(9) == 9
+    assert piecewise_map.location(10) == 20
+    assert piecewise_map.location(27) == 37
+    assert piecewise_map.location(28) == 28
+    assert piecewise_map.best_location(Seeds(start=5, end=40)) == 5
+    assert piecewise_map.best_location(Seeds(start=25, end=40)) == 28
+
+    # seed -> soil -> fertilizer of the puzzle example
+    seed_to_soil = PiecewiseMap.from_map(
+        Map.from_iter(iter(["seed-to-soil", "50 98 2", "52 50 48"])),
+    )
+    soil_to_fertilizer = PiecewiseMap.from_map(
+        Map.from_iter(iter(["soil-to-fertilizer", "0 15 37", "37 52 2", "39 0 15"])),
+    )
+    composed = seed_to_soil.compose(soil_to_fertilizer)
+    for seed in range(120):
+        assert composed.location(seed) == soil_to_fertilizer.location(
+            seed_to_soil.location(seed),
+        )
+
+
+def test_map_array_location() -> None:
+    test_data = [
+        "test",
+        "30 20 8",
+        "20 10 5",
+    ]
+    map_array = MapArray.from_map(Map.from_iter(iter(test_data)))
+    seeds = np.array([0, 9, 10, 14, 15, 19, 20, 27, 28, 40], dtype=np.int64)
+    assert map_array.location(seeds).tolist() == [0, 9, 20, 24, 15, 19, 30, 37, 28, 40]
+
+
+def test_almanac_maps() -> None:
+    almanac = Almanac.from_iter(utils.read_file(2023, "day05.txt"))
+    assert len(almanac.maps) == 7
+    for seed in almanac.seeds:
+        assert almanac.composed_map.location(seed) == almanac.best_location(
+            Seeds(start=seed, end=seed),
+        )
+    seeds = np.array(almanac.seeds, dtype=np.int64)
+    assert almanac.locations(seeds).tolist() == [
+        almanac.composed_map.location(seed) for seed in almanac.seeds
+    ]
+
+
 def test_case_1() -> None:
     assert solve_case_1() == 322500873
 
 
 def test_case_2() -> None:
     assert solve_case_2() == 108956227
+
+
+def test_case_1_composed() -> None:
+    assert solve_case_1_composed() == 322500873
+
+
+def test_case_1_numpy() -> None:
+    assert solve_case_1_numpy() == 322500873
+
+
+def test_case_2_branch_and_bound() -> None:
+    assert solve_case_2_branch_and_bound() == 108956227
+
+
+def test_case_2_composed() -> None:
+    assert solve_case_2_composed() == 108956227
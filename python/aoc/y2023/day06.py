@@ -1,16 +1,68 @@
 import math
+from typing import Final, Sequence
+
+import numpy as np
+import numpy.typing as npt
 
 from aoc import utils
 
+# keep `total_time^2` and `4 * distance` inside int64 for the vectorized solver
+MAX_NUMPY_TIME: Final[int] = 1 << 31
+MAX_NUMPY_DISTANCE: Final[int] = 1 << 60
+
 
 def solve(total_time: int, distance: int) -> int:
-    delta = total_time * total_time - 4 * (distance + 1)
-    if delta < 0:
+    # count x with x * (total_time - x) > distance, the first one is either `x1` or
+    # `x1 + 1` because `isqrt` rounds down, the last one is `total_time - x1`
+    delta = total_time * total_time - 4 * distance
+    if delta <= 0:
         return 0
-    delta_sqrt = math.sqrt(delta)
-    x1 = math.ceil((total_time - delta_sqrt) / 2)
-    x2 = math.floor((total_time + delta_sqrt) / 2)
-    return x2 - x1 + 1
+    x1 = (total_time - math.isqrt(delta)) // 2
+    if x1 * (total_time - x1) <= distance:
+        x1 += 1
+    return max(0, total_time - 2 * x1 + 1)
+
+
+def solve_numpy(
+    total_times: npt.NDArray[np.int64],
+    distances: npt.NDArray[np.int64],
+) -> npt.NDArray[np.int64]:
+    assert (total_times < MAX_NUMPY_TIME).all()
+    assert (distances < MAX_NUMPY_DISTANCE).all()
+
+    delta = total_times * total_times - 4 * distances
+    delta_sqrt = np.sqrt(np.maximum(delta, 0)).astype(np.int64)
+    # float square roots can be off by one in either direction
+    delta_sqrt -= delta_sqrt * delta_sqrt > delta
+    delta_sqrt += (delta_sqrt + 1) * (delta_sqrt + 1) <= delta
+
+    x1 = (total_times - delta_sqrt) // 2
+    x1 += x1 * (total_times - x1) <= distances
+    return np.where(delta > 0, np.maximum(total_times - 2 * x1 + 1, 0), 0)
+
+
+def solve_batch(total_times: Sequence[int], distances: Sequence[int]) -> list[int]:
+    # races that fit in int64 are solved together, the rest fall back to python ints
+    small = [
+        i
+        for i, (t, d) in enumerate(zip(total_times, distances, strict=True))
+        if 0 <= t < MAX_NUMPY_TIME and 0 <= d < MAX_NUMPY_DISTANCE
+    ]
+    results = [0] * len(total_times)
+    small_results = solve_numpy(
+        np.array([total_times[i] for i in small], dtype=np.int64),
+        np.array([distances[i] for i in small], dtype=np.int64),
+    )
+    for i, result in zip(small, small_results.tolist(), strict=True):
+        results[i] = result
+
+    if len(small) < len(total_times):
+        small_set = set(small)
+        for i, (t, d) in enumerate(zip(total_times, distances, strict=True)):
+            if i not in small_set:
+                results[i] = solve(t, d)
+
+    return results
 
 
 def solve_case_1() -> int:
@@ -34,6 +86,48 @@ def solve_case_2() -> int:
     return solve(total_time, distance)
 
 
+def test_solve() -> None:
+    assert solve(7, 9) == 4
+    assert solve(15, 40) == 8
+    assert solve(30, 200) == 9
+    assert solve(71530, 940200) == 71503
+    assert solve(4, 4) == 0
+    assert solve(4, 5) == 0
+
+    # float square roots are not precise enough here
+    total_time = 2 * 10**40 + 1
+    distance = 10**80 + 10**40 - 50
+    middle = total_time // 2
+    assert solve(total_time, distance) == sum(
+        x * (total_time - x) > distance for x in range(middle - 100, middle + 100)
+    )
+
+
+def test_solve_batch() -> None:
+    total_times = [7, 15, 30, 4, 1000, 3_000_000_000, 10**20]
+    distances = [9, 40, 200, 4, 0, 10**15, 10**30]
+    assert solve_batch(total_times, distances) == [
+        solve(t, d) for t, d in zip(total_times, distances, strict=True)
+    ]
+
+    rng = np.random.default_rng(6)
+    total_times_array = rng.integers(0, MAX_NUMPY_TIME, size=1000)
+    distances_array = total_times_array * total_times_array // 4 - rng.integers(
+        -10,
+        10**6,
+        size=1000,
+    )
+    distances_array = np.maximum(distances_array, 0)
+    assert solve_numpy(total_times_array, distances_array).tolist() == [
+        solve(t, d)
+        for t, d in zip(
+            total_times_array.tolist(),
+            distances_array.tolist(),
+            strict=True,
+        )
+    ]
+
+
 def test_case_1() -> None:
     assert solve_case_1() == 4811940
 
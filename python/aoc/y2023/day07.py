@@ -1,9 +1,18 @@
 from __future__ import annotations
 
 import enum
-from collections import Counter
+import heapq
+import itertools
+import tempfile
+from array import array
 from dataclasses import dataclass
-from typing import Self
+from functools import cached_property
+from operator import attrgetter
+from pathlib import Path
+from typing import Final, Iterator, Self
+
+import numpy as np
+import numpy.typing as npt
 
 from aoc import utils
 
@@ -52,81 +61,79 @@ class HandType(enum.IntEnum):
     HighCard = 1
 
     @classmethod
-    def from_str(cls: type[Self], s: str) -> HandType:
-        counter = Counter(s.strip())
-        hand_type = HandType.Unknown
-        match len(counter):
-            case 1:
-                hand_type = HandType.FiveOfKind
-            case 2:
-                hand_type = (
-                    HandType.FourOfKind
-                    if counter.most_common(1)[0][1] == 4
-                    else HandType.FullHouse
-                )
-            case 3:
-                hand_type = (
-                    HandType.ThreeOfKind
-                    if counter.most_common(1)[0][1] == 3
-                    else HandType.TwoPair
-                )
-            case 4:
-                hand_type = HandType.OnePair
-            case 5:
-                hand_type = HandType.HighCard
-            case _:
-                pass
-
-        return hand_type
+    def from_str(cls: type[Self], s: str, ruleset: Ruleset | None = None) -> HandType:
+        # classified through the table of the ruleset, the same as `Hand.from_str`
+        ruleset = ruleset or RULESET
+        return ruleset.hand_type(ruleset.encode(s.strip()))
 
-    @classmethod
-    def from_str_part_2(cls: type[Self], s: str) -> HandType:
-        counter = Counter(s.strip())
-        hand_type = HandType.Unknown
-        match len(counter):
-            case 1:
-                hand_type = HandType.FiveOfKind
-            case 2:
-                if "J" in counter:
-                    # JJJJ1 => 11111
-                    # 1111J => 11111
-                    hand_type = HandType.FiveOfKind
-                else:
-                    hand_type = (
-                        HandType.FourOfKind
-                        if counter.most_common(1)[0][1] == 4
-                        else HandType.FullHouse
-                    )
-            case 3:
-                if "J" in counter:
-                    if counter.most_common(1)[0][1] == 3 or counter["J"] == 2:
-                        # most common = 3, J = 3: JJJ12 => 11112
-                        # most common = 3, J = 1: J1112 => 11112
-                        # most common = 2, J = 2: JJ112 => 11112
-                        hand_type = HandType.FourOfKind
-                    else:
-                        # most common = 2, J = 1: J1122 => 11122
-                        hand_type = HandType.FullHouse
-                else:
-                    hand_type = (
-                        HandType.ThreeOfKind
-                        if counter.most_common(1)[0][1] == 3
-                        else HandType.TwoPair
-                    )
-            case 4:
-                hand_type = (
-                    # JJ123 => 11123
-                    # J1123 => 11123
-                    HandType.ThreeOfKind
-                    if "J" in counter
-                    else HandType.OnePair
-                )
-            case 5:
-                hand_type = HandType.OnePair if "J" in counter else HandType.HighCard
-            case _:
-                pass
-
-        return hand_type
+
+# hand type by the two largest card counts of a hand, the wildcards joining the first
+# one, e.g. a full house is `(3, 2)`
+HAND_TYPE_COUNTS: Final[dict[tuple[int, int], HandType]] = {
+    (5, 0): HandType.FiveOfKind,
+    (4, 1): HandType.FourOfKind,
+    (3, 2): HandType.FullHouse,
+    (3, 1): HandType.ThreeOfKind,
+    (2, 2): HandType.TwoPair,
+    (2, 1): HandType.OnePair,
+    (1, 1): HandType.HighCard,
+}
+
+
+def hand_type_table() -> npt.NDArray[np.uint8]:
+    table = np.zeros((6, 6), dtype=np.uint8)
+    for (first, second), hand_type in HAND_TYPE_COUNTS.items():
+        table[first, second] = hand_type
+    return table
+
+
+HAND_TYPE_TABLE: Final[npt.NDArray[np.uint8]] = hand_type_table()
+
+
+BID_MASK: Final[int] = (1 << 32) - 1
+
+# records per sorted run of the external sort, 8 bytes each
+RUN_SIZE: Final[int] = 1 << 20
+
+
+@dataclass(frozen=True, kw_only=True)
+class Ruleset:
+    # strongest card first
+    cards: list[str]
+    wildcard: str | None = None
+
+    @cached_property
+    def card_ranks(self) -> dict[str, int]:
+        # ranks are reversed so that a higher card gets a higher digit in the sort key
+        return {c: len(self.cards) - 1 - i for i, c in enumerate(self.cards)}
+
+    @cached_property
+    def hand_types(self) -> bytearray:
+        # hand type of every hand, indexed by its cards in base 13
+        size = len(self.cards)
+        digits = np.indices((size,) * 5, dtype=np.uint8).reshape(5, -1)
+        counts = np.stack([(digits == rank).sum(axis=0, dtype=np.uint8) for rank in range(size)])
+        wildcards = np.zeros(size**5, dtype=np.uint8)
+        if self.wildcard is not None:
+            wildcard_rank = self.card_ranks[self.wildcard]
+            wildcards = counts[wildcard_rank].copy()
+            counts[wildcard_rank] = 0
+        counts.sort(axis=0)
+        return bytearray(HAND_TYPE_TABLE[counts[-1] + wildcards, counts[-2]].tobytes())
+
+    def encode(self, hand_repr: str) -> int:
+        # hand type in the high digit, then every card in base 13
+        cards = 0
+        for c in hand_repr:
+            cards = cards * len(self.cards) + self.card_ranks[c]
+        return self.hand_types[cards] * len(self.cards) ** 5 + cards
+
+    def hand_type(self, key: int) -> HandType:
+        return HandType(key // len(self.cards) ** 5)
+
+
+RULESET = Ruleset(cards=CARDS)
+RULESET2 = Ruleset(cards=CARDS2, wildcard="J")
 
 
 @dataclass
@@ -134,75 +141,242 @@ class Hand:
     hand_repr: str
     bid: int
     hand_type: HandType = HandType.Unknown
+    key: int = 0
 
     @classmethod
-    def from_str(cls: type[Self], s: str) -> Self:
+    def from_str(cls: type[Self], s: str, ruleset: Ruleset = RULESET) -> Self:
         hand_repr, bid = s.split()
+        key = ruleset.encode(hand_repr)
         return cls(
             hand_repr=hand_repr,
             bid=int(bid),
-            hand_type=HandType.from_str(hand_repr),
+            hand_type=ruleset.hand_type(key),
+            key=key,
         )
 
     def __lt__(self, other: Hand) -> bool:
-        assert self.hand_type != HandType.Unknown
-        assert other.hand_type != HandType.Unknown
-
-        if self.hand_type.value != other.hand_type.value:
-            return self.hand_type.value < other.hand_type.value
-
-        for c1, c2 in zip(self.hand_repr, other.hand_repr):
-            i1 = CARDS.index(c1)
-            i2 = CARDS.index(c2)
-            if i1 == i2:
-                continue
-            return i1 > i2
-
-        raise ValueError(f"card equal: {self.hand_repr} == {other.hand_repr}")
+        return self.key < other.key
 
 
 @dataclass
-class Hand2:
-    hand_repr: str
-    bid: int
-    hand_type: HandType = HandType.Unknown
+class FenwickTree:
+    data: array[int]
 
     @classmethod
-    def from_str(cls: type[Self], s: str) -> Self:
-        hand_repr, bid = s.split()
+    def with_size(cls: type[Self], size: int) -> Self:
+        return cls(array("q", bytes(8 * (size + 1))))
+
+    def add(self, index: int, value: int) -> None:
+        index += 1
+        while index < len(self.data):
+            self.data[index] += value
+            index += index & -index
+
+    def prefix_sum(self, index: int) -> int:
+        # sum of values in `0 .. index - 1`
+        total = 0
+        while index > 0:
+            total += self.data[index]
+            index -= index & -index
+        return total
+
+
+@dataclass(kw_only=True)
+class RankingIndex:
+    ruleset: Ruleset
+    counts: FenwickTree
+    bids: FenwickTree
+    total_bids: int = 0
+    total_winnings: int = 0
+
+    @classmethod
+    def from_ruleset(cls: type[Self], ruleset: Ruleset) -> Self:
+        key_space = (HandType.FiveOfKind + 1) * len(ruleset.cards) ** 5
         return cls(
-            hand_repr=hand_repr,
-            bid=int(bid),
-            hand_type=HandType.from_str_part_2(hand_repr),
+            ruleset=ruleset,
+            counts=FenwickTree.with_size(key_space),
+            bids=FenwickTree.with_size(key_space),
         )
 
-    def __lt__(self, other: Hand) -> bool:
-        assert self.hand_type != HandType.Unknown
-        assert other.hand_type != HandType.Unknown
+    def rank(self, hand: Hand) -> int:
+        return self.counts.prefix_sum(hand.key) + 1
 
-        if self.hand_type.value != other.hand_type.value:
-            return self.hand_type.value < other.hand_type.value
+    def insert(self, hand: Hand) -> int:
+        # every hand above the new one moves up by one rank, so the winnings grow by
+        # their total bid plus the bid of the new hand at its own rank
+        rank = self.counts.prefix_sum(hand.key + 1) + 1
+        bids_above = self.total_bids - self.bids.prefix_sum(hand.key + 1)
+        self.total_winnings += rank * hand.bid + bids_above
 
-        for c1, c2 in zip(self.hand_repr, other.hand_repr):
-            i1 = CARDS2.index(c1)
-            i2 = CARDS2.index(c2)
-            if i1 == i2:
-                continue
-            return i1 > i2
+        self.counts.add(hand.key, 1)
+        self.bids.add(hand.key, hand.bid)
+        self.total_bids += hand.bid
+        return self.total_winnings
 
-        raise ValueError(f"card equal: {self.hand_repr} == {other.hand_repr}")
+
+def total_winnings(lines: Iterator[str], ruleset: Ruleset) -> int:
+    hands = (Hand.from_str(line, ruleset) for line in lines)
+    sorted_hands = sorted(hands, key=attrgetter("key"))
+    return sum(i * v.bid for i, v in enumerate(sorted_hands, start=1))
+
+
+def total_winnings_streaming(lines: Iterator[str], ruleset: Ruleset) -> int:
+    index = RankingIndex.from_ruleset(ruleset)
+    for line in lines:
+        index.insert(Hand.from_str(line, ruleset))
+    return index.total_winnings
+
+
+def encode_record(line: str, ruleset: Ruleset) -> int:
+    # fixed width record: hand key in the high 32 bits, bid in the low 32 bits
+    hand = Hand.from_str(line, ruleset)
+    assert 0 <= hand.bid <= BID_MASK
+    return hand.key << 32 | hand.bid
+
+
+def read_records(path: Path, buffer_size: int) -> Iterator[int]:
+    with path.open("rb") as f:
+        while True:
+            records = array("Q")
+            try:
+                records.fromfile(f, buffer_size)
+            except EOFError:
+                # the last read is shorter than `buffer_size`
+                yield from records
+                break
+            yield from records
+
+
+def total_winnings_external(
+    lines: Iterator[str],
+    ruleset: Ruleset,
+    run_size: int = RUN_SIZE,
+) -> int:
+    # sort runs of at most `run_size` records, spill them to disk and merge them back
+    with tempfile.TemporaryDirectory() as folder:
+        runs: list[Path] = []
+        for chunk in itertools.batched(lines, run_size):
+            records = array("Q", sorted(encode_record(line, ruleset) for line in chunk))
+            run = Path(folder) / f"run{len(runs)}"
+            with run.open("wb") as f:
+                records.tofile(f)
+            runs.append(run)
+
+        buffer_size = max(1, run_size // max(1, len(runs)))
+        merged = heapq.merge(*(read_records(run, buffer_size) for run in runs))
+        return sum(i * (record & BID_MASK) for i, record in enumerate(merged, start=1))
 
 
 def solve_case_1() -> int:
-    hands = map(Hand.from_str, utils.read_file_with_filter_stripped(2023, "day07.txt"))
-    sorted_hands = sorted(hands)
-    return sum(i * v.bid for i, v in enumerate(sorted_hands, start=1))
+    return total_winnings(
+        utils.read_file_with_filter_stripped(2023, "day07.txt"),
+        RULESET,
+    )
 
 
 def solve_case_2() -> int:
-    hands = map(Hand2.from_str, utils.read_file_with_filter_stripped(2023, "day07.txt"))
-    sorted_hands = sorted(hands)
-    return sum(i * v.bid for i, v in enumerate(sorted_hands, start=1))
+    return total_winnings(
+        utils.read_file_with_filter_stripped(2023, "day07.txt"),
+        RULESET2,
+    )
+
+
+def solve_case_1_streaming() -> int:
+    return total_winnings_streaming(
+        utils.read_file_with_filter_stripped(2023, "day07.txt"),
+        RULESET,
+    )
+
+
+def solve_case_2_external() -> int:
+    return total_winnings_external(
+        utils.read_file_with_filter_stripped(2023, "day07.txt"),
+        RULESET2,
+        run_size=128,
+    )
+
+
+def test_hand_type() -> None:
+    assert HandType.from_str("32T3K") == HandType.OnePair
+    assert HandType.from_str("KTJJT") == HandType.TwoPair
+    assert HandType.from_str("KTJJT", RULESET2) == HandType.FourOfKind
+    assert HandType.from_str("QQQJA", RULESET2) == HandType.FourOfKind
+    assert HandType.from_str("JJJJJ", RULESET2) == HandType.FiveOfKind
+    assert HandType.from_str("J2345", RULESET2) == HandType.OnePair
+    assert HandType.from_str("JJ223", RULESET2) == HandType.FourOfKind
+    assert HandType.from_str("J2233", RULESET2) == HandType.FullHouse
+
+
+def test_hand_type_table() -> None:
+    for ruleset in (RULESET, RULESET2):
+        assert len(ruleset.hand_types) == 13**5
+        hands = itertools.product(ruleset.cards, repeat=5)
+        for hand in itertools.islice(hands, None, None, 97):
+            # card counts sorted descending, the wildcards joining the first one
+            counts = [hand.count(c) for c in ruleset.cards if c != ruleset.wildcard]
+            first, second, *_ = sorted(counts, reverse=True)
+            first += hand.count(ruleset.wildcard) if ruleset.wildcard else 0
+            key = ruleset.encode("".join(hand))
+            assert ruleset.hand_type(key) == HAND_TYPE_COUNTS[first, second]
+
+
+def test_hand_key() -> None:
+    hands = [
+        Hand.from_str("32T3K 765"),
+        Hand.from_str("T55J5 684"),
+        Hand.from_str("KK677 28"),
+        Hand.from_str("KTJJT 220"),
+        Hand.from_str("QQQJA 483"),
+    ]
+    assert [h.bid for h in sorted(hands, key=attrgetter("key"))] == [
+        765,
+        220,
+        28,
+        684,
+        483,
+    ]
+    assert Hand.from_str("2AAAA 1") < Hand.from_str("33332 1")
+    assert Hand.from_str("AAAAA 1").key == (
+        HandType.FiveOfKind * 13**5 + sum(12 * 13**i for i in range(5))
+    )
+
+    hands2 = [Hand.from_str(f"{h.hand_repr} {h.bid}", RULESET2) for h in hands]
+    assert [h.bid for h in sorted(hands2, key=attrgetter("key"))] == [
+        765,
+        28,
+        684,
+        483,
+        220,
+    ]
+
+
+def test_ranking_index() -> None:
+    lines = ["32T3K 765", "T55J5 684", "KK677 28", "KTJJT 220", "QQQJA 483"]
+    for ruleset in (RULESET, RULESET2):
+        index = RankingIndex.from_ruleset(ruleset)
+        for i, line in enumerate(lines, start=1):
+            assert index.insert(Hand.from_str(line, ruleset)) == total_winnings(
+                iter(lines[:i]),
+                ruleset,
+            )
+
+    index = RankingIndex.from_ruleset(RULESET)
+    for line in lines:
+        index.insert(Hand.from_str(line))
+    assert index.rank(Hand.from_str("32T3K 765")) == 1
+    assert index.rank(Hand.from_str("QQQJA 483")) == 5
+    assert index.rank(Hand.from_str("AAAAA 1")) == 6
+
+
+def test_total_winnings_external() -> None:
+    lines = ["32T3K 765", "T55J5 684", "KK677 28", "KTJJT 220", "QQQJA 483"]
+    for ruleset in (RULESET, RULESET2):
+        for run_size in (1, 2, 5, 10):
+            assert total_winnings_external(
+                iter(lines),
+                ruleset,
+                run_size,
+            ) == total_winnings(iter(lines), ruleset)
 
 
 def test_case_1() -> None:
@@ -211,3 +385,11 @@ def test_case_1() -> None:
 
 def test_case_2() -> None:
     assert solve_case_2() == 246894760
+
+
+def test_case_1_streaming() -> None:
+    assert solve_case_1_streaming() == 246912307
+
+
+def test_case_2_external() -> None:
+    assert solve_case_2_external() == 246894760
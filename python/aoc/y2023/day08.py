@@ -1,19 +1,56 @@
 from __future__ import annotations
 
 import enum
+import functools
+import itertools
 import math
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Iterator, Self
+from functools import cached_property
+from typing import Callable, Final, Iterable, Iterator, Self, Sequence
+
+import numpy as np
+import numpy.typing as npt
+import pytest
 
 from aoc import utils
 
+# node names are three characters of `NODE_ALPHABET`, read as base 36 digits
+NODE_ALPHABET: Final[bytes] = b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# -1 marks bytes that are not part of a node name
+NODE_DIGITS: Final[list[int]] = [NODE_ALPHABET.find(c) for c in range(256)]
+NODE_ID_SIZE: Final[int] = 36**3
+NODE_LINE_SIZE: Final[int] = len("AAA = (BBB, CCC)")
+# last digit of the start and end nodes of part 2
+START_DIGIT: Final[int] = NODE_ALPHABET.index(b"A")
+END_DIGIT: Final[int] = NODE_ALPHABET.index(b"Z")
+
+DIRECTION_TABLE: Final[bytes] = bytes.maketrans(b"LR", b"\x00\x01")
+
 
 def extended_euclidean(a: int, b: int) -> tuple[int, int, int]:
     # solve ax + by = gcd(a,b)
-    if b == 0:
-        return 1, 0, a
-    x, y, g = extended_euclidean(b, a % b)
-    return y, x - y * (a // b), g
+    x0, y0, x1, y1 = 1, 0, 0, 1
+    while b != 0:
+        q, r = divmod(a, b)
+        a, b = b, r
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    return x0, y0, a
+
+
+def node_id_at(buffer: bytes, offset: int) -> int:
+    d0 = NODE_DIGITS[buffer[offset]]
+    d1 = NODE_DIGITS[buffer[offset + 1]]
+    d2 = NODE_DIGITS[buffer[offset + 2]]
+    if min(d0, d1, d2) < 0:
+        raise ValueError(f"Invalid node name: {buffer[offset : offset + 3]!r}")
+    return d0 * 1296 + d1 * 36 + d2
+
+
+def node_id(node_repr: str) -> int:
+    return node_id_at(node_repr.encode(), 0)
 
 
 @dataclass
@@ -122,30 +159,55 @@ class Step:
     def step(self, loop: int) -> int:
         return self.value + loop * self.offset
 
+    def contains(self, value: int) -> bool:
+        if value < self.value:
+            return False
+        if self.offset == 0:
+            return value == self.value
+        return (value - self.value) % self.offset == 0
+
+    def covers(self, other: Step) -> bool:
+        if not self.contains(other.value):
+            return False
+        if other.offset == 0:
+            return True
+        return self.offset != 0 and other.offset % self.offset == 0
+
     def merge(self, other: Step) -> Step | None:
-        if self.offset == 0 and other.offset == 0:
-            return self if self.value == other.value else None
+        if self.offset == 0:
+            return self if other.contains(self.value) else None
+        if other.offset == 0:
+            return other if self.contains(other.value) else None
 
         root, _ = diophantine(self.offset, -other.offset, other.value - self.value)
         if root is None:
             return None
 
         value = self.value + root.x * self.offset
-        offset = self.offset * root.offset
+        offset = abs(self.offset * root.offset)
 
-        # find k that value - k * offset is the minimum that higher than self.value and other.value
+        # the minimum value that is higher than self.value and other.value
         min_value = max(self.value, other.value)
-        if value < min_value:
-            k = math.ceil((min_value - value) / offset)
-            value += k * offset
-
-        if value > min_value:
-            k = math.floor((value - min_value) / offset)
-            value -= k * offset
+        value = min_value + (value - min_value) % offset
 
         return Step(value=value, offset=offset)
 
 
+def merge_steps(steps1: list[Step], steps2: list[Step]) -> list[Step]:
+    merged = (step1.merge(step2) for step1 in steps1 for step2 in steps2)
+    return prune_steps(step for step in merged if step is not None)
+
+
+def prune_steps(steps: Iterable[Step]) -> list[Step]:
+    # drop duplicates and steps already covered by an earlier periodic step
+    pruned: list[Step] = []
+    for step in sorted(steps, key=lambda x: (x.value, -x.offset)):
+        if any(p.covers(step) for p in pruned):
+            continue
+        pruned.append(step)
+    return pruned
+
+
 @dataclass(kw_only=True)
 class Graph:
     path: Path
@@ -206,6 +268,343 @@ class Graph:
         return list(map(to_step, steps_int))
 
 
+@dataclass(kw_only=True)
+class CycleAnalysis:
+    # for every node of a functional graph: the number of moves before reaching its
+    # cycle and the id of that cycle, `cycle_lengths` is indexed by cycle id
+    tails: array[int]
+    cycle_ids: array[int]
+    cycle_lengths: array[int]
+
+    @classmethod
+    def from_full_path(cls: type[Self], next_nodes: array[int]) -> Self:
+        size = len(next_nodes)
+        tails = array("i", [-1]) * size
+        cycle_ids = array("i", [-1]) * size
+        cycle_lengths = array("i")
+        # position of a node on the current walk, only valid while it is on the walk
+        on_walk = array("i", [-1]) * size
+
+        for start in range(size):
+            if cycle_ids[start] >= 0:
+                continue
+
+            walk: list[int] = []
+            node = start
+            while cycle_ids[node] < 0 and on_walk[node] < 0:
+                on_walk[node] = len(walk)
+                walk.append(node)
+                node = next_nodes[node]
+
+            for walk_node in walk:
+                on_walk[walk_node] = -1
+
+            if cycle_ids[node] < 0:
+                # the walk closed a new cycle, starting at `node`
+                cycle_start = walk.index(node)
+                for cycle_node in walk[cycle_start:]:
+                    tails[cycle_node] = 0
+                    cycle_ids[cycle_node] = len(cycle_lengths)
+                cycle_lengths.append(len(walk) - cycle_start)
+                walk = walk[:cycle_start]
+
+            for tail_node in reversed(walk):
+                next_node = next_nodes[tail_node]
+                tails[tail_node] = tails[next_node] + 1
+                cycle_ids[tail_node] = cycle_ids[next_node]
+
+        return cls(tails=tails, cycle_ids=cycle_ids, cycle_lengths=cycle_lengths)
+
+    def length(self, node: int) -> int:
+        return self.cycle_lengths[self.cycle_ids[node]]
+
+
+@dataclass(kw_only=True)
+class CompiledGraph:
+    # `transitions[direction][node]` is the next node, `directions[i]` is the
+    # direction taken at step `i` of the path
+    transitions: tuple[array[int], array[int]]
+    directions: bytes
+    is_end: bytearray
+
+    # node after walking the whole path once, and the first step inside the path
+    # at which the walker stands on an end node (-1 if there is none)
+    full_path: array[int]
+    first_hit: array[int]
+
+    @classmethod
+    def from_tables(
+        cls: type[Self],
+        transitions: tuple[array[int], array[int]],
+        directions: bytes,
+        is_end: bytearray,
+        nodes: Iterable[int] | None = None,
+    ) -> Self:
+        # only `nodes` are walked, the others are left as unreachable self loops
+        full_path = array("i", range(len(is_end)))
+        first_hit = array("i", [-1]) * len(is_end)
+        for node in range(len(is_end)) if nodes is None else nodes:
+            current = node
+            for i, direction in enumerate(directions):
+                if first_hit[node] < 0 and is_end[current]:
+                    first_hit[node] = i
+                current = transitions[direction][current]
+            full_path[node] = current
+
+        return cls(
+            transitions=transitions,
+            directions=directions,
+            is_end=is_end,
+            full_path=full_path,
+            first_hit=first_hit,
+        )
+
+    @classmethod
+    def from_graph(cls: type[Self], graph: Graph, end_ids: Iterable[int]) -> Self:
+        left = array("i", (node.left for node in graph.nodes))
+        right = array("i", (node.right for node in graph.nodes))
+        directions = bytes(d.value for d in graph.path.data)
+        is_end = bytearray(len(graph.nodes))
+        for end_id in end_ids:
+            is_end[end_id] = 1
+        return cls.from_tables((left, right), directions, is_end)
+
+    @classmethod
+    def from_bytes(
+        cls: type[Self],
+        buffer: bytes,
+        is_end: Callable[[int], bool],
+    ) -> tuple[Self, list[int]]:
+        # every node line is `AAA = (BBB, CCC)`, so names are read from fixed
+        # columns and interned as base 36 numbers, returns the graph and its nodes
+        path_end = buffer.index(b"\n")
+        path = buffer[:path_end].strip()
+        if path.translate(None, b"LR"):
+            raise ValueError(f"Invalid direction: {path!r}")
+        directions = path.translate(DIRECTION_TABLE)
+
+        start = path_end
+        while buffer[start] in b"\r\n":
+            start += 1
+        width = buffer.index(b"\n", start) - start + 1
+
+        left = array("i", bytes(4 * NODE_ID_SIZE))
+        right = array("i", bytes(4 * NODE_ID_SIZE))
+        nodes: list[int] = []
+        for offset in range(start, len(buffer) - NODE_LINE_SIZE + 1, width):
+            node_id = node_id_at(buffer, offset)
+            left[node_id] = node_id_at(buffer, offset + 7)
+            right[node_id] = node_id_at(buffer, offset + 12)
+            nodes.append(node_id)
+
+        end_table = bytearray(NODE_ID_SIZE)
+        for node_id in nodes:
+            end_table[node_id] = is_end(node_id)
+
+        compiled_graph = cls.from_tables((left, right), directions, end_table, nodes)
+        return compiled_graph, nodes
+
+    def __len__(self) -> int:
+        return len(self.is_end)
+
+    @property
+    def path_length(self) -> int:
+        return len(self.directions)
+
+    @property
+    def lifting_levels(self) -> int:
+        # the walk enters a cycle within `len(self)` walks of the whole path, so any
+        # end node is reached before then
+        return len(self.full_path).bit_length()
+
+    @cached_property
+    def jumps(self) -> list[array[int]]:
+        # `jumps[j][node]`: node after walking the whole path `2^j` times, levels are
+        # added by `jump` as they are needed
+        return [self.full_path]
+
+    @cached_property
+    def hits(self) -> list[bytearray]:
+        # `hits[j][node]`: an end node is reached within `2^j` walks of the whole path,
+        # levels are added by `hit` as they are needed
+        first_hit = np.frombuffer(self.first_hit, dtype=np.int32)
+        return [bytearray((first_hit >= 0).tobytes())]
+
+    def jump(self, level: int) -> array[int]:
+        while len(self.jumps) <= level:
+            jump = np.frombuffer(self.jumps[-1], dtype=np.int32)
+            self.jumps.append(array("i", jump[jump].tobytes()))
+        return self.jumps[level]
+
+    def hit(self, level: int) -> bytearray:
+        while len(self.hits) <= level:
+            jump = np.frombuffer(self.jump(len(self.hits) - 1), dtype=np.int32)
+            hit = np.frombuffer(self.hits[-1], dtype=np.uint8)
+            self.hits.append(bytearray((hit | hit[jump]).tobytes()))
+        return self.hits[level]
+
+    def walk(self, node: int, steps: int) -> int:
+        # walk the first `steps` steps of the path one by one
+        for direction in itertools.islice(self.directions, steps):
+            node = self.transitions[direction][node]
+        return node
+
+    def position(self, start: int, steps: int) -> int:
+        full_paths, remaining_steps = divmod(steps, self.path_length)
+        node = start
+        for j in range(full_paths.bit_length()):
+            if full_paths >> j & 1:
+                node = self.jump(j)[node]
+        return self.walk(node, remaining_steps)
+
+    @cached_property
+    def cycle_analysis(self) -> CycleAnalysis:
+        return CycleAnalysis.from_full_path(self.full_path)
+
+    def prepare(self) -> Self:
+        # fill the cached tables that `steps` reads, so that pickled copies carry them
+        _ = self.cycle_analysis
+        return self
+
+    def steps(self, start: int) -> list[Step]:
+        # the walk from `start` enters its cycle after `tail` whole paths, so walking
+        # `tail + length` whole paths records every step at which an end is reached
+        tail = self.cycle_analysis.tails[start]
+        length = self.cycle_analysis.length(start)
+        steps_int: list[int] = []
+
+        node = start
+        counter = 0
+        for _ in range(tail + length):
+            if self.first_hit[node] < 0:
+                node = self.full_path[node]
+                counter += self.path_length
+                continue
+            for direction in self.directions:
+                if self.is_end[node]:
+                    steps_int.append(counter)
+                node = self.transitions[direction][node]
+                counter += 1
+
+        start_loop = tail * self.path_length
+        offset = length * self.path_length
+
+        def to_step(v: int) -> Step:
+            if v >= start_loop:
+                return Step(value=v, offset=offset)
+            return Step(value=v, offset=0)
+
+        return list(map(to_step, steps_int))
+
+    @cached_property
+    def transition_table(self) -> npt.NDArray[np.int32]:
+        return np.array(self.transitions, dtype=np.int32)
+
+    @cached_property
+    def direction_table(self) -> npt.NDArray[np.int32]:
+        return np.frombuffer(self.directions, dtype=np.uint8).astype(np.int32)
+
+    @cached_property
+    def end_table(self) -> npt.NDArray[np.bool_]:
+        return np.frombuffer(self.is_end, dtype=np.bool_)
+
+    def lockstep(self, starts: Sequence[int], max_steps: int) -> int | None:
+        # move every walker at once, until all of them stand on an end node
+        positions = np.array(starts, dtype=np.int32)
+        for counter in range(max_steps):
+            if self.end_table[positions].all():
+                return counter
+            direction = self.direction_table[counter % self.path_length]
+            positions = self.transition_table[direction, positions]
+        return None
+
+    def cycle_parameters(
+        self,
+        starts: Sequence[int],
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        # floyd's cycle detection over whole path walks, for all walkers at once,
+        # returns the number of whole walks before the cycle and the cycle length
+        full_path = np.array(self.full_path, dtype=np.int32)
+        starts_array = np.array(starts, dtype=np.int32)
+
+        tortoise = full_path[starts_array]
+        hare = full_path[tortoise]
+        while (active := tortoise != hare).any():
+            tortoise[active] = full_path[tortoise[active]]
+            hare[active] = full_path[full_path[hare[active]]]
+
+        tortoise = starts_array.copy()
+        tail = np.zeros(len(starts_array), dtype=np.int64)
+        while (active := tortoise != hare).any():
+            tortoise[active] = full_path[tortoise[active]]
+            hare[active] = full_path[hare[active]]
+            tail[active] += 1
+
+        hare = full_path[tortoise]
+        length = np.ones(len(starts_array), dtype=np.int64)
+        while (active := tortoise != hare).any():
+            hare[active] = full_path[hare[active]]
+            length[active] += 1
+
+        return tail, length
+
+    def lockstep_steps(self, starts: Sequence[int]) -> list[list[Step]]:
+        tail, length = self.cycle_parameters(starts)
+        start_loops = (tail * self.path_length).tolist()
+        offsets = (length * self.path_length).tolist()
+        limits = (tail + length) * self.path_length
+
+        steps: list[list[Step]] = [[] for _ in starts]
+        positions = np.array(starts, dtype=np.int32)
+        for counter in range(int(limits.max())):
+            hits = self.end_table[positions] & (counter < limits)
+            for i in np.flatnonzero(hits).tolist():
+                offset = offsets[i] if counter >= start_loops[i] else 0
+                steps[i].append(Step(value=counter, offset=offset))
+            direction = self.direction_table[counter % self.path_length]
+            positions = self.transition_table[direction, positions]
+        return steps
+
+    def first_end(self, start: int) -> int | None:
+        # skip the longest run of whole paths without an end node, the first hit is
+        # then inside the next walk of the path
+        node = start
+        steps = 0
+        for j in reversed(range(self.lifting_levels)):
+            if not self.hit(j)[node]:
+                node = self.jump(j)[node]
+                steps += (1 << j) * self.path_length
+        if not self.hit(0)[node]:
+            return None
+        return steps + self.first_hit[node]
+
+
+# compiled graph of the current worker process, set once by `init_worker`
+WORKER_GRAPHS: dict[str, CompiledGraph] = {}
+
+
+def init_worker(compiled_graph: CompiledGraph) -> None:
+    WORKER_GRAPHS["graph"] = compiled_graph
+
+
+def worker_steps(start: int) -> list[Step]:
+    return WORKER_GRAPHS["graph"].steps(start)
+
+
+def parallel_steps(
+    compiled_graph: CompiledGraph,
+    starts: Sequence[int],
+    max_workers: int | None = None,
+) -> list[list[Step]]:
+    # the graph is sent to every worker once, tasks only carry the start node
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=init_worker,
+        initargs=(compiled_graph.prepare(),),
+    ) as executor:
+        return list(executor.map(worker_steps, starts))
+
+
 def solve_case_1() -> int:
     graph = Graph.from_lines(utils.read_file_with_filter_stripped(2023, "day08.txt"))
     steps = graph.steps_iter("AAA", "ZZZ")
@@ -217,37 +616,268 @@ def solve_case_2() -> int:
     start_nodes = [k for k in graph.node_counter.node_ids if k.endswith("A")]
     end_nodes = [k for k in graph.node_counter.node_ids if k.endswith("Z")]
 
-    paths: list[list[Step]] = []
-    for start in start_nodes:
-        counters: list[Step] = []
-        for end in end_nodes:
-            counters.extend(
-                graph.steps_iter(start, end),
-            )
-        paths.append(counters)
+    compiled_graph = CompiledGraph.from_graph(
+        graph,
+        graph.node_counter.get_ids(*end_nodes),
+    )
+    paths = [
+        compiled_graph.steps(start_id)
+        for start_id in graph.node_counter.get_ids(*start_nodes)
+    ]
 
     assert paths
+    result = functools.reduce(merge_steps, paths)
 
-    def merge_path(path1: list[Step], path2: list[Step]) -> Iterator[Step]:
-        for step1 in path1:
-            for step2 in path2:
-                step = step1.merge(step2)
-                if step is not None:
-                    yield step
+    assert result
+    return min(step.value for step in result)
+
+
+def solve_case_2_parallel() -> int:
+    graph = Graph.from_lines(utils.read_file_with_filter_stripped(2023, "day08.txt"))
+    start_ids = [v for k, v in graph.node_counter.node_ids.items() if k.endswith("A")]
+    end_ids = [v for k, v in graph.node_counter.node_ids.items() if k.endswith("Z")]
+    compiled_graph = CompiledGraph.from_graph(graph, end_ids)
 
-    result = paths[0]
-    for path in paths[1:]:
-        # merge two paths
-        result = list(merge_path(result, path))
+    paths = parallel_steps(compiled_graph, start_ids)
+    assert paths
+    result = functools.reduce(merge_steps, paths)
 
     assert result
-    result = sorted(result, key=lambda x: x.value)
-    return result[0].value
+    return min(step.value for step in result)
+
+
+def solve_case_1_compiled() -> int:
+    graph = Graph.from_lines(utils.read_file_with_filter_stripped(2023, "day08.txt"))
+    compiled_graph = CompiledGraph.from_graph(
+        graph,
+        [graph.node_counter.get_id("ZZZ")],
+    )
+    steps = compiled_graph.first_end(graph.node_counter.get_id("AAA"))
+    assert steps is not None
+    return steps
+
+
+def test_compiled_graph() -> None:
+    lines = [
+        "LLR",
+        "AAA = (BBB, BBB)",
+        "BBB = (AAA, ZZZ)",
+        "ZZZ = (ZZZ, ZZZ)",
+        "CCC = (CCC, CCC)",
+    ]
+    graph = Graph.from_lines(iter(lines))
+    aaa, zzz, ccc = graph.node_counter.get_ids("AAA", "ZZZ", "CCC")
+    compiled_graph = CompiledGraph.from_graph(graph, [zzz])
+    assert compiled_graph.first_end(aaa) == 6
+    assert compiled_graph.first_end(zzz) == 0
+    assert compiled_graph.first_end(ccc) is None
+    # 4 nodes need 3 levels of lifting
+    assert len(compiled_graph.jumps) == len(compiled_graph.hits) == 3
+
+    node = aaa
+    for steps in range(20):
+        assert compiled_graph.position(aaa, steps) == node
+        node = graph.nodes[node].go_next(graph.path.get_direction(steps))
+    # levels past the cap are only built for the bits of a long walk
+    assert compiled_graph.position(aaa, 3 << 60) == zzz
+    assert len(compiled_graph.jumps) == 61
+
+
+def test_extended_euclidean() -> None:
+    assert extended_euclidean(240, 46) == (-9, 47, 2)
+    a = 2**200 + 3
+    b = 3**150
+    x, y, g = extended_euclidean(a, b)
+    assert g == math.gcd(a, b)
+    assert a * x + b * y == g
+
+
+def test_step_merge() -> None:
+    assert Step(value=2, offset=0).merge(Step(value=2, offset=0)) == Step(
+        value=2,
+        offset=0,
+    )
+    assert Step(value=2, offset=0).merge(Step(value=3, offset=0)) is None
+    assert Step(value=8, offset=0).merge(Step(value=2, offset=3)) == Step(
+        value=8,
+        offset=0,
+    )
+    assert Step(value=2, offset=3).merge(Step(value=9, offset=0)) is None
+    assert Step(value=2, offset=4).merge(Step(value=3, offset=6)) is None
+    assert Step(value=2, offset=4).merge(Step(value=4, offset=6)) == Step(
+        value=10,
+        offset=12,
+    )
+
+    # float division is not precise enough for these
+    p1 = 2**89 - 1
+    p2 = 2**107 - 1
+    step = Step(value=p1 - 1, offset=p1).merge(Step(value=p2 - 1, offset=p2))
+    assert step == Step(value=p1 * p2 - 1, offset=p1 * p2)
+
+
+def test_prune_steps() -> None:
+    assert prune_steps(
+        [
+            Step(value=10, offset=4),
+            Step(value=6, offset=4),
+            Step(value=14, offset=0),
+            Step(value=6, offset=4),
+            Step(value=3, offset=0),
+            Step(value=14, offset=8),
+        ],
+    ) == [Step(value=3, offset=0), Step(value=6, offset=4)]
+
+
+def test_compiled_graph_steps() -> None:
+    lines = [
+        "LR",
+        "11A = (11B, XXX)",
+        "11B = (XXX, 11Z)",
+        "11Z = (11B, XXX)",
+        "22A = (22B, XXX)",
+        "22B = (22C, 22C)",
+        "22C = (22Z, 22Z)",
+        "22Z = (22B, 22B)",
+        "XXX = (XXX, XXX)",
+    ]
+    graph = Graph.from_lines(iter(lines))
+    end_ids = graph.node_counter.get_ids("11Z", "22Z")
+    compiled_graph = CompiledGraph.from_graph(graph, end_ids)
+    steps1 = compiled_graph.steps(graph.node_counter.get_id("11A"))
+    steps2 = compiled_graph.steps(graph.node_counter.get_id("22A"))
+    assert steps1 == [Step(value=2, offset=2)]
+    assert steps2 == [Step(value=3, offset=6), Step(value=6, offset=6)]
+    assert min(step.value for step in merge_steps(steps1, steps2)) == 6
+
+
+def test_cycle_analysis() -> None:
+    # 0 -> 1 -> 2 -> 3 -> 1, 4 -> 4, 5 -> 0, 6 -> 5
+    analysis = CycleAnalysis.from_full_path(array("i", [1, 2, 3, 1, 4, 0, 5]))
+    assert analysis.tails.tolist() == [1, 0, 0, 0, 0, 2, 3]
+    assert analysis.cycle_ids.tolist() == [0, 0, 0, 0, 1, 0, 0]
+    assert analysis.cycle_lengths.tolist() == [3, 1]
+    assert [analysis.length(node) for node in range(7)] == [3, 3, 3, 3, 1, 3, 3]
+
+
+def test_lockstep() -> None:
+    lines = [
+        "LR",
+        "11A = (11B, XXX)",
+        "11B = (XXX, 11Z)",
+        "11Z = (11B, XXX)",
+        "22A = (22B, XXX)",
+        "22B = (22C, 22C)",
+        "22C = (22Z, 22Z)",
+        "22Z = (22B, 22B)",
+        "XXX = (XXX, XXX)",
+    ]
+    graph = Graph.from_lines(iter(lines))
+    end_ids = graph.node_counter.get_ids("11Z", "22Z")
+    start_ids = graph.node_counter.get_ids("11A", "22A")
+    compiled_graph = CompiledGraph.from_graph(graph, end_ids)
+    assert compiled_graph.lockstep(start_ids, 100) == 6
+    assert compiled_graph.lockstep(start_ids, 6) is None
+
+    tail, length = compiled_graph.cycle_parameters(start_ids)
+    assert tail.tolist() == [1, 1]
+    assert length.tolist() == [1, 3]
+    assert compiled_graph.lockstep_steps(start_ids) == [
+        compiled_graph.steps(start_id) for start_id in start_ids
+    ]
+
+
+def solve_case_1_bytes() -> int:
+    end_id = node_id("ZZZ")
+    compiled_graph, _ = CompiledGraph.from_bytes(
+        utils.read_bytes(2023, "day08.txt"),
+        lambda x: x == end_id,
+    )
+    steps = compiled_graph.first_end(node_id("AAA"))
+    assert steps is not None
+    return steps
+
+
+def solve_case_2_bytes() -> int:
+    compiled_graph, nodes = CompiledGraph.from_bytes(
+        utils.read_bytes(2023, "day08.txt"),
+        lambda x: x % 36 == END_DIGIT,
+    )
+    paths = [compiled_graph.steps(node) for node in nodes if node % 36 == START_DIGIT]
+    result = functools.reduce(merge_steps, paths)
+    return min(step.value for step in result)
+
+
+def test_from_bytes() -> None:
+    buffer = b"""LR
+
+11A = (11B, XXX)
+11B = (XXX, 11Z)
+11Z = (11B, XXX)
+22A = (22B, XXX)
+22B = (22C, 22C)
+22C = (22Z, 22Z)
+22Z = (22B, 22B)
+XXX = (XXX, XXX)"""
+    compiled_graph, nodes = CompiledGraph.from_bytes(
+        buffer,
+        lambda x: x % 36 == END_DIGIT,
+    )
+    assert node_id("11A") == 1 * 1296 + 1 * 36 + 10
+    assert nodes == list(
+        map(node_id, ["11A", "11B", "11Z", "22A", "22B", "22C", "22Z", "XXX"]),
+    )
+    assert compiled_graph.directions == b"\x00\x01"
+    assert compiled_graph.transitions[0][node_id("22C")] == node_id("22Z")
+    assert compiled_graph.transitions[1][node_id("11B")] == node_id("11Z")
+    starts = [node_id("11A"), node_id("22A")]
+    assert compiled_graph.lockstep(starts, 100) == 6
+    assert NODE_DIGITS[ord("c")] == NODE_DIGITS[ord(" ")] == -1
+    with pytest.raises(ValueError, match="Invalid node name"):
+        CompiledGraph.from_bytes(buffer.replace(b"22C", b"22c"), bool)
+    with pytest.raises(ValueError, match="Invalid direction"):
+        CompiledGraph.from_bytes(buffer.replace(b"LR", b"LX"), bool)
 
 
 def test_case_1() -> None:
     assert solve_case_1() == 12361
 
 
+def test_lockstep_steps() -> None:
+    graph = Graph.from_lines(utils.read_file_with_filter_stripped(2023, "day08.txt"))
+    start_ids = [v for k, v in graph.node_counter.node_ids.items() if k.endswith("A")]
+    end_ids = [v for k, v in graph.node_counter.node_ids.items() if k.endswith("Z")]
+    compiled_graph = CompiledGraph.from_graph(graph, end_ids)
+    assert compiled_graph.lockstep_steps(start_ids) == [
+        compiled_graph.steps(start_id) for start_id in start_ids
+    ]
+
+
+def test_parallel_steps() -> None:
+    graph = Graph.from_lines(utils.read_file_with_filter_stripped(2023, "day08.txt"))
+    start_ids = [v for k, v in graph.node_counter.node_ids.items() if k.endswith("A")]
+    end_ids = [v for k, v in graph.node_counter.node_ids.items() if k.endswith("Z")]
+    compiled_graph = CompiledGraph.from_graph(graph, end_ids)
+    assert parallel_steps(compiled_graph, start_ids, max_workers=2) == [
+        compiled_graph.steps(start_id) for start_id in start_ids
+    ]
+
+
+def test_case_1_compiled() -> None:
+    assert solve_case_1_compiled() == 12361
+
+
 def test_case_2() -> None:
     assert solve_case_2() == 18215611419223
+
+
+def test_case_2_parallel() -> None:
+    assert solve_case_2_parallel() == 18215611419223
+
+
+def test_case_1_bytes() -> None:
+    assert solve_case_1_bytes() == 12361
+
+
+def test_case_2_bytes() -> None:
+    assert solve_case_2_bytes() == 18215611419223
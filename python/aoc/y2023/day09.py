@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import functools
 import itertools
-from dataclasses import dataclass
+import math
+from dataclasses import dataclass, field
 from functools import cached_property
-from typing import Iterator, Self
+from typing import Final, Iterable, Iterator, Self
+
+import numpy as np
 
 from aoc import utils
 
+INT64_LIMIT: Final[int] = 1 << 63
+
 
 @dataclass
 class HistorySequence:
@@ -56,6 +62,126 @@ class History:
         return start
 
 
+@functools.cache
+def extrapolation_weights(size: int) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    # the next and the previous values are fixed combinations of the sequence, the
+    # weight of `x_i` is `(-1)^(size-1-i) * C(size, i)` for the next value and
+    # `(-1)^i * C(size, i+1)` for the previous one
+    next_weights = tuple(
+        (-1) ** (size - 1 - i) * math.comb(size, i) for i in range(size)
+    )
+    previous_weights = tuple((-1) ** i * math.comb(size, i + 1) for i in range(size))
+    return next_weights, previous_weights
+
+
+def extrapolate(histories: Iterable[list[int]]) -> tuple[int, int]:
+    # sum of next values and sum of previous values, histories of the same size are
+    # extrapolated together with a single matrix-vector product
+    groups: dict[int, list[list[int]]] = {}
+    for history in histories:
+        groups.setdefault(len(history), []).append(history)
+
+    total_next = 0
+    total_previous = 0
+    for size, group in groups.items():
+        weights = np.array(extrapolation_weights(size), dtype=object)
+        max_value = max(abs(v) for history in group for v in history)
+        max_weight = max(abs(w) for w in weights.flat)
+        if max_value * max_weight * size < INT64_LIMIT:
+            weights = weights.astype(np.int64)
+            matrix = np.array(group, dtype=np.int64)
+        else:
+            matrix = np.array(group, dtype=object)
+        values = matrix @ weights.T
+        total_next += int(values[:, 0].sum())
+        total_previous += int(values[:, 1].sum())
+    return total_next, total_previous
+
+
+def extrapolate_in_place(buffer: list[int]) -> tuple[int, int]:
+    # difference `buffer` in place and only keep the running next and previous
+    # values, stopping at the first constant layer, `buffer` is overwritten
+    next_value = 0
+    previous_value = 0
+    sign = 1
+    for size in range(len(buffer), 0, -1):
+        next_value += buffer[size - 1]
+        previous_value += sign * buffer[0]
+        sign = -sign
+
+        constant = True
+        for i in range(size - 1):
+            buffer[i] = buffer[i + 1] - buffer[i]
+            constant = constant and buffer[i] == 0
+        if constant:
+            break
+    return next_value, previous_value
+
+
+@dataclass(kw_only=True)
+class NewtonPolynomial:
+    # leading value of every difference layer down to the first constant one, the
+    # value at index `x` is `sum(coefficients[k] * C(x, k))`
+    coefficients: list[int]
+    size: int
+
+    @classmethod
+    def from_values(cls: type[Self], values: list[int]) -> Self:
+        buffer = list(values)
+        coefficients: list[int] = []
+        for size in range(len(buffer), 0, -1):
+            coefficients.append(buffer[0])
+
+            constant = True
+            for i in range(size - 1):
+                buffer[i] = buffer[i + 1] - buffer[i]
+                constant = constant and buffer[i] == 0
+            if constant:
+                break
+        return cls(coefficients=coefficients, size=len(values))
+
+    def at(self, index: int) -> int:
+        # `C(index, k)` also holds for negative indices
+        value = 0
+        binomial = 1
+        for k, coefficient in enumerate(self.coefficients):
+            value += coefficient * binomial
+            binomial = binomial * (index - k) // (k + 1)
+        return value
+
+    def after(self, steps: int) -> int:
+        return self.at(self.size - 1 + steps)
+
+    def before(self, steps: int) -> int:
+        return self.at(-steps)
+
+
+@dataclass
+class HistoryPredictor:
+    # last value of every difference layer, trailing all-zero layers are dropped
+    # since they do not change the prediction
+    lasts: list[int] = field(default_factory=list)
+    count: int = 0
+
+    def append(self, value: int) -> int:
+        self.count += 1
+        new_lasts = [value]
+        for last in self.lasts:
+            new_lasts.append(new_lasts[-1] - last)
+        # the dropped layers ended with zero, so each of them now ends with the
+        # value of the layer above, only needed while that value is not zero and
+        # there are fewer layers than readings
+        while new_lasts[-1] != 0 and len(new_lasts) < self.count:
+            new_lasts.append(new_lasts[-1])
+        while len(new_lasts) > 1 and new_lasts[-1] == 0:
+            new_lasts.pop()
+        self.lasts = new_lasts
+        return self.prediction()
+
+    def prediction(self) -> int:
+        return sum(self.lasts)
+
+
 def solve_case_1() -> int:
     histories = map(
         History.from_str,
@@ -72,6 +198,28 @@ def solve_case_2() -> int:
     return sum(h.get_first_history() for h in histories)
 
 
+def solve_case_1_numpy() -> int:
+    lines = utils.read_file_with_filter_stripped(2023, "day09.txt")
+    total_next, _ = extrapolate(list(map(int, line.split())) for line in lines)
+    return total_next
+
+
+def solve_case_2_numpy() -> int:
+    lines = utils.read_file_with_filter_stripped(2023, "day09.txt")
+    _, total_previous = extrapolate(list(map(int, line.split())) for line in lines)
+    return total_previous
+
+
+def solve_case_1_in_place() -> int:
+    lines = utils.read_file_with_filter_stripped(2023, "day09.txt")
+    return sum(extrapolate_in_place(list(map(int, line.split())))[0] for line in lines)
+
+
+def solve_case_2_in_place() -> int:
+    lines = utils.read_file_with_filter_stripped(2023, "day09.txt")
+    return sum(extrapolate_in_place(list(map(int, line.split())))[1] for line in lines)
+
+
 def test_next_sequence() -> None:
     assert HistorySequence([0, 3, 6, 9, 12, 15]).next_sequence() == HistorySequence(
         [3, 3, 3, 3, 3],
@@ -94,9 +242,88 @@ def test_history() -> None:
     assert History.from_str("1 3 6 10 15 21").get_last_history() == 28
 
 
+def test_extrapolate() -> None:
+    assert extrapolation_weights(1) == ((1,), (1,))
+    assert extrapolation_weights(3) == ((1, -3, 3), (3, -3, 1))
+
+    lines = ["0 3 6 9 12 15", "1 3 6 10 15 21", "10 13 16 21 30 45"]
+    assert extrapolate(list(map(int, line.split())) for line in lines) == (
+        sum(History.from_str(line).get_last_history() for line in lines),
+        sum(History.from_str(line).get_first_history() for line in lines),
+    )
+
+    # too large for int64
+    history = [10**18 * i**3 for i in range(10)]
+    assert extrapolate([history]) == (10**21, -(10**18))
+
+
+def test_extrapolate_in_place() -> None:
+    assert extrapolate_in_place([0, 3, 6, 9, 12, 15]) == (18, -3)
+    assert extrapolate_in_place([1, 3, 6, 10, 15, 21]) == (28, 0)
+    assert extrapolate_in_place([10, 13, 16, 21, 30, 45]) == (68, 5)
+    assert extrapolate_in_place([5]) == (5, 5)
+    assert extrapolate_in_place([7, 7, 7]) == (7, 7)
+
+
+def test_newton_polynomial() -> None:
+    polynomial = NewtonPolynomial.from_values([10, 13, 16, 21, 30, 45])
+    assert polynomial.coefficients == [10, 3, 0, 2]
+    assert [polynomial.at(i) for i in range(6)] == [10, 13, 16, 21, 30, 45]
+    assert polynomial.after(1) == 68
+    assert polynomial.before(1) == 5
+
+    values = [i**3 - 4 * i + 1 for i in range(8)]
+    polynomial = NewtonPolynomial.from_values(values)
+    for steps in (1, 2, 10, 10**12):
+        x = len(values) - 1 + steps
+        assert polynomial.after(steps) == x**3 - 4 * x + 1
+        assert polynomial.before(steps) == (-steps) ** 3 + 4 * steps + 1
+
+
+def test_history_predictor() -> None:
+    predictor = HistoryPredictor()
+    predictions = [predictor.append(v) for v in [0, 3, 6, 9, 12, 15]]
+    assert predictions == [0, 6, 9, 12, 15, 18]
+    assert predictor.lasts == [15, 3]
+
+    # a quadratic feed keeps three layers however long it runs
+    predictor = HistoryPredictor()
+    for i in range(10_000):
+        prediction = predictor.append(3 * i * i + 1)
+        assert len(predictor.lasts) <= 3
+    assert prediction == 3 * 10_000**2 + 1
+
+    for line in itertools.islice(
+        utils.read_file_with_filter_stripped(2023, "day09.txt"),
+        20,
+    ):
+        values = list(map(int, line.split()))
+        predictor = HistoryPredictor()
+        for size, value in enumerate(values, start=1):
+            assert predictor.append(value) == NewtonPolynomial.from_values(
+                values[:size],
+            ).after(1)
+
+
 def test_case_1() -> None:
     assert solve_case_1() == 1637452029
 
 
 def test_case_2() -> None:
     assert solve_case_2() == 908
+
+
+def test_case_1_numpy() -> None:
+    assert solve_case_1_numpy() == 1637452029
+
+
+def test_case_2_numpy() -> None:
+    assert solve_case_2_numpy() == 908
+
+
+def test_case_1_in_place() -> None:
+    assert solve_case_1_in_place() == 1637452029
+
+
+def test_case_2_in_place() -> None:
+    assert solve_case_2_in_place() == 908
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 import enum
 import itertools
+from array import array
 from collections import deque
 from dataclasses import dataclass
 from functools import cached_property
-from typing import Callable, Iterator, Literal, Self
+from typing import Callable, Final, Iterator, Literal, Self
 
 import more_itertools
 
@@ -250,6 +251,363 @@ class Field:
         return sum(t.tile_type == TileType.UNVISITED for t in self.good_tiles())
 
 
+# pipe codes of the flat grids, in the same order as `Pipe`
+PIPE_CODES: Final[bytes] = bytes.maketrans(
+    "".join(Pipe).encode(),
+    bytes(range(len(Pipe))),
+)
+CODE_UD: Final[int] = list(Pipe).index(Pipe.UD)
+CODE_LR: Final[int] = list(Pipe).index(Pipe.LR)
+CODE_GROUND: Final[int] = list(Pipe).index(Pipe.Ground)
+
+# whether the pipe with a given code connects to its right / left / bottom / top
+# neighbour in the doubled grid, the start connects to any pipe opening to it
+OPENS_RIGHT: Final[bytes] = bytes(
+    p in (Pipe.Start, Pipe.LR, Pipe.UR, Pipe.DR) for p in Pipe
+)
+OPENS_LEFT: Final[bytes] = bytes(
+    p in (Pipe.Start, Pipe.LR, Pipe.UL, Pipe.DL) for p in Pipe
+)
+OPENS_DOWN: Final[bytes] = bytes(
+    p in (Pipe.Start, Pipe.UD, Pipe.DR, Pipe.DL) for p in Pipe
+)
+OPENS_UP: Final[bytes] = bytes(
+    p in (Pipe.Start, Pipe.UD, Pipe.UR, Pipe.UL) for p in Pipe
+)
+
+TILE_UNVISITED: Final[int] = 0
+TILE_VISITED: Final[int] = 1
+TILE_BORDER: Final[int] = 2
+
+
+@dataclass
+class FlatField:
+    # the doubled grid of `Field`, stored row by row in flat arrays
+    pipes: bytearray
+    tiles: bytearray
+    scores: array[int]
+    rows: int
+    cols: int
+
+    @classmethod
+    def from_lines(cls: type[Self], lines: Iterator[str]) -> Self:
+        codes = [line.encode().translate(PIPE_CODES) for line in lines]
+        rows = 2 * len(codes) + 1
+        cols = 2 * len(codes[0]) + 1
+
+        pipes = bytearray([CODE_GROUND]) * (rows * cols)
+        for x, line_codes in enumerate(codes):
+            start = (2 * x + 1) * cols
+            pipes[start + 1 : start + cols : 2] = line_codes
+
+        tiles = bytearray(rows * cols)
+        scores = array("i", bytes(4 * rows * cols))
+        return cls(pipes, tiles, scores, rows, cols)
+
+    @cached_property
+    def start(self) -> int:
+        return self.pipes.index(list(Pipe).index(Pipe.Start))
+
+    def build(self) -> Self:
+        pipes = self.pipes
+        cols = self.cols
+        for x in range(1, self.rows, 2):
+            for i in range(x * cols + 1, (x + 1) * cols - 2, 2):
+                if OPENS_RIGHT[pipes[i]] and OPENS_LEFT[pipes[i + 2]]:
+                    pipes[i + 1] = CODE_LR
+        for x in range(1, self.rows - 2, 2):
+            for i in range(x * cols + 1, (x + 1) * cols, 2):
+                if OPENS_DOWN[pipes[i]] and OPENS_UP[pipes[i + 2 * cols]]:
+                    pipes[i + cols] = CODE_UD
+        return self
+
+    def flood_scores(self) -> Self:
+        pipes, tiles, scores = self.pipes, self.tiles, self.scores
+        tiles[self.start] = TILE_VISITED
+        points: deque[int] = deque([self.start])
+
+        while len(points) > 0:
+            p0 = points.popleft()
+            for d in (-self.cols, self.cols, -1, 1):
+                # two pipes are connected when the tile between them is a pipe
+                p1 = p0 + d
+                if pipes[p1] == CODE_GROUND:
+                    continue
+
+                if tiles[p1] != TILE_VISITED:
+                    tiles[p1] = TILE_VISITED
+                    scores[p1] = scores[p0] + 1
+
+                p2 = p1 + d
+                if tiles[p2] != TILE_VISITED:
+                    tiles[p2] = TILE_VISITED
+                    scores[p2] = scores[p0] + 2
+                    points.append(p2)
+
+        return self
+
+    def flood_border(self) -> Self:
+        tiles = self.tiles
+        cols = self.cols
+        tiles[0] = TILE_BORDER
+        points: deque[int] = deque([0])
+
+        while len(points) > 0:
+            p = points.popleft()
+            y = p % cols
+            for q, in_bound in (
+                (p - cols, p >= cols),
+                (p + cols, p + cols < len(tiles)),
+                (p - 1, y > 0),
+                (p + 1, y < cols - 1),
+            ):
+                if in_bound and tiles[q] == TILE_UNVISITED:
+                    tiles[q] = TILE_BORDER
+                    points.append(q)
+
+        return self
+
+    def good_tiles(self) -> Iterator[int]:
+        # flat indices of the tiles of the original grid
+        for x in range(1, self.rows, 2):
+            yield from range(x * self.cols + 1, (x + 1) * self.cols, 2)
+
+    def max_score(self) -> int:
+        return max(self.scores[i] for i in self.good_tiles())
+
+    def max_borders(self) -> int:
+        return sum(self.tiles[i] == TILE_UNVISITED for i in self.good_tiles())
+
+
+# open sides of a pipe as a bit mask
+SIDE_N: Final[int] = 1
+SIDE_E: Final[int] = 2
+SIDE_S: Final[int] = 4
+SIDE_W: Final[int] = 8
+
+PIPE_MASKS: Final[bytes] = bytes.maketrans(
+    "".join(Pipe).encode(),
+    bytes(
+        [
+            SIDE_N | SIDE_S,  # UD
+            SIDE_E | SIDE_W,  # LR
+            SIDE_N | SIDE_E,  # UR
+            SIDE_N | SIDE_W,  # UL
+            SIDE_S | SIDE_W,  # DL
+            SIDE_S | SIDE_E,  # DR
+            0,  # Ground
+            0,  # Start, resolved from its neighbours in `build`
+        ],
+    ),
+)
+
+
+@dataclass
+class MaskField:
+    # the grid at native resolution, every tile is a mask of its open sides
+    masks: bytearray
+    tiles: bytearray
+    scores: array[int]
+    rows: int
+    cols: int
+    start: int
+
+    @classmethod
+    def from_lines(cls: type[Self], lines: Iterator[str]) -> Self:
+        data = [line.encode() for line in lines]
+        rows = len(data)
+        cols = len(data[0])
+        start = b"".join(data).index(Pipe.Start.encode())
+        masks = bytearray(b"".join(data).translate(PIPE_MASKS))
+        tiles = bytearray(rows * cols)
+        scores = array("i", bytes(4 * rows * cols))
+        return cls(masks, tiles, scores, rows, cols, start)
+
+    def neighbours(self, p: int) -> Iterator[tuple[int, int, int]]:
+        # (side, opposite side, neighbour) of every neighbour inside the grid
+        x, y = divmod(p, self.cols)
+        if x > 0:
+            yield SIDE_N, SIDE_S, p - self.cols
+        if y < self.cols - 1:
+            yield SIDE_E, SIDE_W, p + 1
+        if x < self.rows - 1:
+            yield SIDE_S, SIDE_N, p + self.cols
+        if y > 0:
+            yield SIDE_W, SIDE_E, p - 1
+
+    def connected(self, p: int) -> Iterator[int]:
+        # two tiles are connected when both open to each other
+        for side, opposite, q in self.neighbours(p):
+            if self.masks[p] & side and self.masks[q] & opposite:
+                yield q
+
+    def build(self) -> Self:
+        self.masks[self.start] = sum(
+            side
+            for side, opposite, q in self.neighbours(self.start)
+            if self.masks[q] & opposite
+        )
+        return self
+
+    def flood_scores(self) -> Self:
+        # scores are kept in doubled grid units, the same as `Field`
+        self.tiles[self.start] = TILE_VISITED
+        points: deque[int] = deque([self.start])
+
+        while len(points) > 0:
+            p = points.popleft()
+            for q in self.connected(p):
+                if self.tiles[q] != TILE_VISITED:
+                    self.tiles[q] = TILE_VISITED
+                    self.scores[q] = self.scores[p] + 2
+                    points.append(q)
+
+        return self
+
+    def blocked_horizontal(self, x: int, y: int) -> bool:
+        # edge between the tiles above and below corners (x, y) - (x, y + 1)
+        if x in (0, self.rows):
+            return False
+        above = (x - 1) * self.cols + y
+        below = above + self.cols
+        return (
+            self.tiles[above] == TILE_VISITED
+            and self.tiles[below] == TILE_VISITED
+            and self.masks[above] & SIDE_S != 0
+            and self.masks[below] & SIDE_N != 0
+        )
+
+    def blocked_vertical(self, x: int, y: int) -> bool:
+        # edge between the tiles left and right of corners (x, y) - (x + 1, y)
+        if y in (0, self.cols):
+            return False
+        right = x * self.cols + y
+        left = right - 1
+        return (
+            self.tiles[left] == TILE_VISITED
+            and self.tiles[right] == TILE_VISITED
+            and self.masks[left] & SIDE_E != 0
+            and self.masks[right] & SIDE_W != 0
+        )
+
+    def flood_border(self) -> Self:
+        # walk the corners between tiles instead of inflating the grid, moving
+        # between two corners crosses the edge between two tiles, which is only
+        # blocked when both tiles are on the loop and connected through that edge
+        rows, cols = self.rows, self.cols
+        corner_cols = cols + 1
+        corners = bytearray((rows + 1) * corner_cols)
+        corners[0] = 1
+        points: deque[tuple[int, int]] = deque([(0, 0)])
+
+        while len(points) > 0:
+            x, y = points.popleft()
+            for nx, ny, blocked in (
+                (x, y + 1, y < cols and self.blocked_horizontal(x, y)),
+                (x, y - 1, y > 0 and self.blocked_horizontal(x, y - 1)),
+                (x + 1, y, x < rows and self.blocked_vertical(x, y)),
+                (x - 1, y, x > 0 and self.blocked_vertical(x - 1, y)),
+            ):
+                if not (0 <= nx <= rows and 0 <= ny <= cols) or blocked:
+                    continue
+                if not corners[nx * corner_cols + ny]:
+                    corners[nx * corner_cols + ny] = 1
+                    points.append((nx, ny))
+
+        # a tile off the loop reaches all of its corners, so checking one is enough
+        for p in range(rows * cols):
+            x, y = divmod(p, cols)
+            if self.tiles[p] == TILE_UNVISITED and corners[x * corner_cols + y]:
+                self.tiles[p] = TILE_BORDER
+
+        return self
+
+    def max_score(self) -> int:
+        return max(self.scores)
+
+    def max_borders(self) -> int:
+        return self.tiles.count(TILE_UNVISITED)
+
+
+# (dx, dy) of the sides a pipe opens to
+PIPE_DIRECTIONS: Final[dict[str, tuple[tuple[int, int], tuple[int, int]]]] = {
+    Pipe.UD: ((-1, 0), (1, 0)),
+    Pipe.LR: ((0, -1), (0, 1)),
+    Pipe.UR: ((-1, 0), (0, 1)),
+    Pipe.UL: ((-1, 0), (0, -1)),
+    Pipe.DL: ((1, 0), (0, -1)),
+    Pipe.DR: ((1, 0), (0, 1)),
+}
+
+
+def pipe_opens_to(grid: list[str], x: int, y: int, dx: int, dy: int) -> bool:
+    if not (0 <= x < len(grid) and 0 <= y < len(grid[x])):
+        return False
+    return (dx, dy) in PIPE_DIRECTIONS.get(grid[x][y], ())
+
+
+def walk_loop(
+    grid: list[str],
+    x: int,
+    y: int,
+    dx: int,
+    dy: int,
+) -> tuple[int, int] | None:
+    # walk from the start back to it, summing the shoelace terms along the way,
+    # returns the length and the doubled signed area, or `None` when the pipes lead
+    # off the grid or into a dead end
+    length = 0
+    double_area = 0
+    while True:
+        nx, ny = x + dx, y + dy
+        double_area += x * ny - nx * y
+        length += 1
+        x, y = nx, ny
+        if not (0 <= x < len(grid) and 0 <= y < len(grid[x])):
+            return None
+        if grid[x][y] == Pipe.Start:
+            return length, double_area
+        if not pipe_opens_to(grid, x, y, -dx, -dy):
+            return None
+        first, second = PIPE_DIRECTIONS[grid[x][y]]
+        dx, dy = second if first == (-dx, -dy) else first
+
+
+@dataclass(kw_only=True)
+class Loop:
+    length: int
+    # twice the area enclosed by the centers of the loop tiles
+    double_area: int
+
+    @classmethod
+    def from_lines(cls: type[Self], lines: Iterator[str]) -> Self:
+        grid = list(lines)
+        sx, sy = next(
+            (x, y)
+            for x, line in enumerate(grid)
+            for y, c in enumerate(line)
+            if c == Pipe.Start
+        )
+        # any neighbour may open toward the start, only the loop leads back to it
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            if pipe_opens_to(grid, sx + dx, sy + dy, -dx, -dy):
+                walked = walk_loop(grid, sx, sy, dx, dy)
+                if walked is not None:
+                    break
+        else:
+            raise ValueError("No loop through the start")
+
+        length, double_area = walked
+        return cls(length=length, double_area=abs(double_area))
+
+    def farthest(self) -> int:
+        return self.length // 2
+
+    def enclosed(self) -> int:
+        # pick's theorem: area = inside + boundary / 2 - 1
+        return (self.double_area - self.length) // 2 + 1
+
+
 def solve_case_1() -> int:
     return (
         Field.from_lines(
@@ -274,9 +632,179 @@ def solve_case_2() -> int:
     )
 
 
+def solve_case_1_flat() -> int:
+    return (
+        FlatField.from_lines(
+            utils.read_file_with_filter_stripped(2023, "day10.txt"),
+        )
+        .build()
+        .flood_scores()
+        .max_score()
+        // 2
+    )
+
+
+def solve_case_2_flat() -> int:
+    return (
+        FlatField.from_lines(
+            utils.read_file_with_filter_stripped(2023, "day10.txt"),
+        )
+        .build()
+        .flood_scores()
+        .flood_border()
+        .max_borders()
+    )
+
+
+def solve_case_1_mask() -> int:
+    return (
+        MaskField.from_lines(
+            utils.read_file_with_filter_stripped(2023, "day10.txt"),
+        )
+        .build()
+        .flood_scores()
+        .max_score()
+        // 2
+    )
+
+
+def solve_case_2_mask() -> int:
+    return (
+        MaskField.from_lines(
+            utils.read_file_with_filter_stripped(2023, "day10.txt"),
+        )
+        .build()
+        .flood_scores()
+        .flood_border()
+        .max_borders()
+    )
+
+
+def solve_case_1_loop() -> int:
+    return Loop.from_lines(
+        utils.read_file_with_filter_stripped(2023, "day10.txt"),
+    ).farthest()
+
+
+def solve_case_2_loop() -> int:
+    return Loop.from_lines(
+        utils.read_file_with_filter_stripped(2023, "day10.txt"),
+    ).enclosed()
+
+
+def test_mask_field() -> None:
+    lines = [
+        "..........",
+        ".S------7.",
+        ".|F----7|.",
+        ".||....||.",
+        ".||....||.",
+        ".|L-7F-J|.",
+        ".|..||..|.",
+        ".L--JL--J.",
+        "..........",
+    ]
+    field = Field.from_lines(iter(lines)).build().flood_scores().flood_border()
+    mask_field = MaskField.from_lines(iter(lines)).build().flood_scores().flood_border()
+    assert mask_field.masks[mask_field.start] == SIDE_E | SIDE_S
+    assert mask_field.max_score() == field.max_score()
+    assert mask_field.max_borders() == field.max_borders() == 4
+
+
+def test_loop() -> None:
+    lines = [
+        "..F7.",
+        ".FJ|.",
+        "SJ.L7",
+        "|F--J",
+        "LJ...",
+    ]
+    assert Loop.from_lines(iter(lines)).farthest() == 8
+
+    lines = [
+        "FF7FSF7F7F7F7F7F---7",
+        "L|LJ||||||||||||F--J",
+        "FL-7LJLJ||||||LJL-77",
+        "F--JF--7||LJLJ7F7FJ-",
+        "L---JF-JLJ.||-FJLJJ7",
+        "|F|F-JF---7F7-L7L|7|",
+        "|FFJF7L7F-JF7|JL---7",
+        "7-L-JL7||F7|L7F-7F7|",
+        "L.L7LFJ|||||FJL7||LJ",
+        "L7JLJL-JLJLJL--JLJ.L",
+    ]
+    assert Loop.from_lines(iter(lines)).enclosed() == 10
+
+    # pipes that point at the start without being on the loop
+    lines = [
+        ".....",
+        ".|...",
+        ".S-7.",
+        ".|.|.",
+        ".L-J.",
+        ".....",
+    ]
+    loop = Loop.from_lines(iter(lines))
+    assert (loop.farthest(), loop.enclosed()) == (4, 1)
+
+    lines = [
+        "|....",
+        "S-7..",
+        "|.|..",
+        "L-J..",
+    ]
+    loop = Loop.from_lines(iter(lines))
+    assert (loop.farthest(), loop.enclosed()) == (4, 1)
+
+
+def test_flat_field() -> None:
+    lines = [
+        "..........",
+        ".S------7.",
+        ".|F----7|.",
+        ".||....||.",
+        ".||....||.",
+        ".|L-7F-J|.",
+        ".|..||..|.",
+        ".L--JL--J.",
+        "..........",
+    ]
+    field = Field.from_lines(iter(lines)).build().flood_scores().flood_border()
+    flat_field = FlatField.from_lines(iter(lines)).build().flood_scores().flood_border()
+    assert flat_field.pipes == bytearray(
+        list(Pipe).index(p) for pipes in field.pipes for p in pipes
+    )
+    assert flat_field.max_score() == field.max_score()
+    assert flat_field.max_borders() == field.max_borders() == 4
+
+
 def test_case_1() -> None:
     assert solve_case_1() == 6838
 
 
 def test_case_2() -> None:
     assert solve_case_2() == 451
+
+
+def test_case_1_flat() -> None:
+    assert solve_case_1_flat() == 6838
+
+
+def test_case_2_flat() -> None:
+    assert solve_case_2_flat() == 451
+
+
+def test_case_1_mask() -> None:
+    assert solve_case_1_mask() == 6838
+
+
+def test_case_2_mask() -> None:
+    assert solve_case_2_mask() == 451
+
+
+def test_case_1_loop() -> None:
+    assert solve_case_1_loop() == 6838
+
+
+def test_case_2_loop() -> None:
+    assert solve_case_2_loop() == 451